@@ -0,0 +1,72 @@
+import functools
+
+import numpy as np
+import torch
+from tqdm import tqdm
+from transformers import BertTokenizerFast, BertModel
+
+# 默认模型与推理参数
+MODEL_NAME = 'bert-base-chinese'
+MAX_LENGTH = 128
+BATCH_SIZE = 64
+# 推理后端：'torch'、'onnx-int8'（动态量化的 ONNX Runtime，CPU 上更快）或 'onnx-fp32'
+BACKEND = 'torch'
+
+
+@functools.lru_cache(maxsize=None)
+def load_bert(model_name=MODEL_NAME, backend=BACKEND, num_threads=None):
+    """
+    加载快速分词器和 BertModel（或同接口的 ONNX 模型），同一进程内只加载一次。
+    num_threads 只用于 ONNX Runtime 会话；PyTorch 后端的线程数由 torch.set_num_threads 全局设置。
+    """
+    print(f"加载 {model_name} 模型（{backend}）...")
+    if backend != 'torch':
+        from ONNX推理 import load_onnx_encoder
+        return load_onnx_encoder(model_name, num_threads, quantized=backend == 'onnx-int8')
+    tokenizer = BertTokenizerFast.from_pretrained(model_name)
+    model = BertModel.from_pretrained(model_name)
+    model.eval()
+    return tokenizer, model
+
+
+def encode_texts(texts, model_name=MODEL_NAME, batch_size=BATCH_SIZE, max_length=MAX_LENGTH,
+                 num_threads=None, show_progress=False, backend=BACKEND):
+    """
+    批量计算评论的句向量（CLS token 表示），返回形状为 (评论数, hidden_size) 的连续 float32 矩阵，行顺序与 texts 一致。
+    评论按 token 长度排序后分批，每批只填充到本批最长评论的长度。
+    """
+    if backend == 'torch':
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        tokenizer, model = load_bert(model_name, backend)
+    else:
+        tokenizer, model = load_bert(model_name, backend, num_threads)
+
+    texts = list(texts)
+    embeddings = np.empty((len(texts), model.config.hidden_size), dtype=np.float32)
+    if not texts:
+        return embeddings
+
+    # 一次性分词（不填充），按长度排序
+    encodings = tokenizer(texts, truncation=True, max_length=max_length)
+    lengths = np.fromiter(map(len, encodings['input_ids']), dtype=np.int64, count=len(texts))
+    order = np.argsort(lengths, kind='stable')
+
+    batches = range(0, len(order), batch_size)
+    if show_progress:
+        batches = tqdm(batches, desc="BERT嵌入处理进度")
+    with torch.inference_mode():
+        for begin in batches:
+            batch_indices = order[begin:begin + batch_size]
+            features = [{key: encodings[key][i] for key in encodings.keys()} for i in batch_indices]
+            batch = tokenizer.pad(features, return_tensors='pt')
+            outputs = model(**batch)
+            embeddings[batch_indices] = outputs.last_hidden_state[:, 0, :].numpy()
+    return embeddings
+
+
+def embedding_key(model_name=MODEL_NAME, backend=BACKEND):
+    """
+    嵌入存储中区分模型的键：不同后端的向量存在细微差异，分开保存。
+    """
+    return model_name if backend == 'torch' else f"{model_name}@{backend}"
@@ -0,0 +1,102 @@
+import glob
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from gensim import corpora, models
+from gensim.models import CoherenceModel
+
+from 分词缓存 import STOP_WORDS, load_tokenized_corpus, tokenized_corpus_key, cached_corpus_path
+from LDA语料缓存 import build_corpus_artifacts, artifact_paths
+from LDA训练 import model_dir, default_workers
+
+from 数据目录 import dataset_path
+
+# 扫描模型与结果表的保存目录
+sweep_dir = os.path.join(model_dir, "主题数扫描")
+
+# 子进程共享的词典、语料和分词文本（每个进程只加载一次）
+_dictionary = None
+_corpus = None
+_texts = None
+
+
+# --- Step 1: 子进程训练与一致性评分 ---
+def _init_worker(dictionary_path, corpus_path, texts_path):
+    global _dictionary, _corpus, _texts
+    _dictionary = corpora.Dictionary.load(dictionary_path)
+    _corpus = corpora.MmCorpus(corpus_path)
+    with open(texts_path, 'r', encoding='utf-8') as f:
+        _texts = json.load(f)
+
+
+def _train_and_score(task):
+    num_topics, alpha, eta, passes, model_path = task
+    model = models.LdaModel(_corpus, num_topics=num_topics, id2word=_dictionary, alpha=alpha, eta=eta,
+                            passes=passes, random_state=42)
+    c_v = CoherenceModel(model=model, texts=_texts, dictionary=_dictionary, coherence='c_v',
+                         processes=1).get_coherence()
+    u_mass = CoherenceModel(model=model, corpus=_corpus, dictionary=_dictionary,
+                            coherence='u_mass').get_coherence()
+    model.save(model_path)
+    print(f"主题数 {num_topics}, alpha={alpha}, eta={eta}: c_v={c_v:.4f}, u_mass={u_mass:.4f}")
+    return {'num_topics': num_topics, 'alpha': alpha, 'eta': eta, 'c_v': c_v, 'u_mass': u_mass,
+            'model_path': model_path}
+
+
+# --- Step 2: 并行扫描 ---
+def sweep_topics(file_path, stop_words, topic_range=range(4, 17, 2), alphas=('symmetric', 'asymmetric'),
+                 etas=(None,), passes=10, metric='c_v', workers=None, filter_params=None):
+    """
+    在共享的缓存语料上并行训练不同主题数（及 alpha/eta）的 LDA 模型，按一致性评分排序。
+    结果表保存为 CSV，只保留评分最高的模型，返回 (结果表, 最优模型路径)。
+    """
+    tokens_key = tokenized_corpus_key(file_path, stop_words)
+    build_corpus_artifacts(lambda: load_tokenized_corpus(file_path, stop_words)[0], tokens_key, filter_params)
+    _, dictionary_path, corpus_path = artifact_paths(tokens_key, filter_params)
+    texts_path = cached_corpus_path(tokens_key)
+    if not os.path.exists(texts_path):
+        # c_v 一致性需要分词结果，子进程从分词缓存文件读取
+        load_tokenized_corpus(file_path, stop_words)
+
+    os.makedirs(sweep_dir, exist_ok=True)
+    tasks = []
+    for num_topics, alpha, eta in itertools.product(topic_range, alphas, etas):
+        name = f"lda_k{num_topics}_{alpha}_{eta or 'default'}.lda"
+        tasks.append((num_topics, alpha, eta, passes, os.path.join(sweep_dir, name)))
+
+    workers = min(workers or default_workers(), len(tasks))
+    print(f"\n并行训练 {len(tasks)} 个模型，进程数: {workers}...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dictionary_path, corpus_path, texts_path)) as pool:
+        results = list(pool.map(_train_and_score, tasks))
+
+    # u_mass 越接近 0 越好，c_v 越大越好，两者都按降序排列
+    table = pd.DataFrame(results).sort_values(metric, ascending=False).reset_index(drop=True)
+    results_file = os.path.join(sweep_dir, "扫描结果.csv")
+    table.to_csv(results_file, index=False, encoding='utf-8-sig')
+    print(f"扫描结果已保存到: {results_file}")
+
+    # 只保留最优模型，删除其余模型文件（gensim 会附带保存 .state、.npy 等文件）
+    for model_path in table['model_path'].iloc[1:]:
+        for path in glob.glob(glob.escape(model_path) + '*'):
+            os.remove(path)
+    best_path = table.loc[0, 'model_path']
+    print(f"最优模型: 主题数 {table.loc[0, 'num_topics']}, {metric}={table.loc[0, metric]:.4f}, 路径: {best_path}")
+    return table, best_path
+
+
+# --- Step 3: 主程序 ---
+def main():
+    file_path = dataset_path('scored_comments')
+    stop_words = STOP_WORDS
+
+    table, _ = sweep_topics(file_path, stop_words, topic_range=range(4, 17, 2),
+                            alphas=('symmetric', 'asymmetric'), etas=(None, 'auto'))
+    print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
-import pandas as pd
-from gensim import corpora, models
 import pyLDAvis
 import pyLDAvis.gensim
-import jieba
-from tqdm import tqdm
 import warnings
-import os
+
+from 分词缓存 import STOP_WORDS, load_tokenized_corpus, tokenized_corpus_key
+from LDA语料缓存 import build_corpus_artifacts
+from LDA训练 import train_lda, save_lda
+
+from 数据目录 import dataset_path, data_path
 
 warnings.filterwarnings("ignore")
 
@@ -13,45 +14,34 @@ warnings.filterwarnings("ignore")
 # --- Step 1: 数据加载与预处理 ---
 def load_and_preprocess_data(file_path):
     """
-    加载 JSON 数据并提取评论内容，进行分词与预处理。
+    加载 JSON 数据并提取评论内容，进行分词与预处理（多进程分词，结果缓存到磁盘）。
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"指定的文件路径不存在: {file_path}")
-
-    print("\n加载评论数据...")
-    df = pd.read_json(file_path)
-
-    print("提取评论内容...")
-    contents = df['content'].dropna().tolist()
+    stop_words = STOP_WORDS
 
-    print("开始分词和停用词过滤...")
-    stop_words = {'的', '了', '是', '呢', '啊', '吧', '都', '和', '着', '在', '也', '你', '我', '他', '她', '我们', '这', '那', '一个', '有', '说', '要', '到'}
+    tokens_key = tokenized_corpus_key(file_path, stop_words)
 
-    processed_texts = []
-    for content in tqdm(contents, desc="处理文本"):
-        try:
-            tokens = jieba.cut(content)
-            filtered_tokens = [word for word in tokens if word not in stop_words and len(word) > 1]
-            processed_texts.append(filtered_tokens)
-        except Exception as e:
-            print(f"处理文本时出错: {e}")
-            continue
+    # 只有词典与词袋语料未缓存时才读取（或重新计算）分词结果
+    def load_texts():
+        processed_texts, _ = load_tokenized_corpus(file_path, stop_words)
+        print("分词与预处理完成！")
+        return processed_texts
 
-    print("分词与预处理完成！")
-    return processed_texts
+    return load_texts, tokens_key
 
 
 # --- Step 2: 构建词袋模型与LDA主题建模 ---
-def lda_topic_modeling(processed_texts, num_topics=5, passes=10):
+def lda_topic_modeling(load_texts, tokens_key, num_topics=5, passes=10, filter_params=None,
+                       workers=None, time_budget=None):
     """
-    使用LDA对文本进行主题建模。
+    使用LDA对文本进行主题建模。词典与词袋语料保存到磁盘并流式读取，不同参数的重复运行直接复用。
     """
-    print("\n构建词袋模型...")
-    dictionary = corpora.Dictionary(processed_texts)
-    corpus = [dictionary.doc2bow(text) for text in processed_texts]
+    dictionary, corpus = build_corpus_artifacts(load_texts, tokens_key, filter_params)
 
     print(f"训练LDA模型，主题数: {num_topics}, passes: {passes}...")
-    lda_model = models.LdaModel(corpus, num_topics=num_topics, id2word=dictionary, passes=passes, random_state=42)
+    # 多核训练；time_budget（秒）不为空时按运行时间而非 passes 控制训练
+    lda_model = train_lda(corpus, dictionary, num_topics=num_topics, passes=passes, workers=workers,
+                          time_budget=time_budget)
+    save_lda(lda_model, f"lda_{num_topics}")  # 保存模型，之后可用 LDA训练.update_lda 增量更新
 
     print("LDA模型训练完成！")
     return lda_model, corpus, dictionary
@@ -81,21 +71,21 @@ def visualize_topics(lda_model, corpus, dictionary, output_path='lda_visualizati
 # --- Step 5: 主函数 ---
 def main():
     # 文件路径
-    file_path = r"D:/theguidetoculturaledconomic/数据/情感分析结果打分版本.json"
+    file_path = dataset_path('scored_comments')
 
     try:
         # Step 1: 加载与预处理数据
-        processed_texts = load_and_preprocess_data(file_path)
+        load_texts, tokens_key = load_and_preprocess_data(file_path)
 
         # Step 2: LDA建模
         num_topics = 8  # 设置提取的主题数
-        lda_model, corpus, dictionary = lda_topic_modeling(processed_texts, num_topics=num_topics, passes=10)
+        lda_model, corpus, dictionary = lda_topic_modeling(load_texts, tokens_key, num_topics=num_topics, passes=10)
 
         # Step 3: 显示主题及关键词概率分布
         display_topics(lda_model, num_topics=num_topics, num_words=10)
 
         # Step 4: 可视化主题并保存为 HTML
-        output_file = r"D:/theguidetoculturaledconomic/数据/lda_visualization.html"
+        output_file = data_path("lda_visualization.html")
         visualize_topics(lda_model, corpus, dictionary, output_path=output_file)
 
         print("\nLDA主题建模分析完成！")
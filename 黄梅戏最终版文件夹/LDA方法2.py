@@ -1,27 +1,22 @@
-import pandas as pd
-from gensim import corpora, models
 from nltk.corpus import stopwords
-import jieba
 import pyLDAvis.gensim_models
 import pyLDAvis
 import nltk
-from tqdm import tqdm
 import warnings
 
+from 分词缓存 import load_tokenized_corpus, tokenized_corpus_key
+from LDA语料缓存 import build_corpus_artifacts
+from LDA训练 import train_lda, save_lda
+
+from 数据目录 import dataset_path
+
 warnings.filterwarnings("ignore")
 
 # --- Step 1: 数据加载与预处理 ---
 def load_and_preprocess_data(file_path):
     """
-    加载 JSON 数据并提取评论内容，进行分词与预处理。
+    加载 JSON 数据并提取评论内容，进行分词与预处理（多进程分词，结果缓存到磁盘）。
     """
-    print("加载评论数据...")
-    df = pd.read_json(file_path)
-
-    print("提取评论内容...")
-    contents = df['content'].dropna().tolist()
-
-    print("开始分词和停用词过滤...")
     # 下载NLTK停用词（仅首次需要）
     nltk.download('stopwords')
     stop_words = set(stopwords.words('chinese')) if 'chinese' in stopwords.fileids() else set()
@@ -30,26 +25,31 @@ def load_and_preprocess_data(file_path):
                              "就是", "可以", "不会", "不是", "没有", "这样", "已经","doge", "吃瓜", "知道"])
     stop_words.update(custom_stop_words)
 
-    processed_texts = []
-    for content in tqdm(contents, desc="处理文本"):
-        tokens = jieba.cut(content)  # 使用 jieba 进行中文分词
-        filtered_tokens = [word for word in tokens if word not in stop_words and len(word) > 1]
-        processed_texts.append(filtered_tokens)
+    tokens_key = tokenized_corpus_key(file_path, stop_words)
+
+    # 只有词典与词袋语料未缓存时才读取（或重新计算）分词结果
+    def load_texts():
+        processed_texts, _ = load_tokenized_corpus(file_path, stop_words)  # 使用 jieba 进行中文分词
+        print("分词与预处理完成！")
+        return processed_texts
 
-    print("分词与预处理完成！")
-    return processed_texts
+    return load_texts, tokens_key
 
 
 # --- Step 2: 构建LDA主题模型 ---
-def lda_topic_modeling(processed_texts, num_topics=5, passes=15):
+def lda_topic_modeling(load_texts, tokens_key, num_topics=5, passes=15, filter_params=None,
+                       workers=None, time_budget=None):
     """
-    使用LDA对文本进行主题建模。
+    使用LDA对文本进行主题建模。词典与词袋语料保存到磁盘并流式读取，不同参数的重复运行直接复用。
     """
-    print(f"构建词袋模型和训练LDA，主题数: {num_topics}, passes: {passes}...")
-    dictionary = corpora.Dictionary(processed_texts)  # 构建字典
-    corpus = [dictionary.doc2bow(text) for text in processed_texts]  # 构建词袋模型
+    dictionary, corpus = build_corpus_artifacts(load_texts, tokens_key, filter_params)  # 构建字典与词袋模型
+
+    print(f"训练LDA，主题数: {num_topics}, passes: {passes}...")
 
-    lda_model = models.LdaModel(corpus, num_topics=num_topics, id2word=dictionary, passes=passes, random_state=42)
+    # 多核训练；time_budget（秒）不为空时按运行时间而非 passes 控制训练
+    lda_model = train_lda(corpus, dictionary, num_topics=num_topics, passes=passes, workers=workers,
+                          time_budget=time_budget)
+    save_lda(lda_model, f"lda_{num_topics}")  # 保存模型，之后可用 LDA训练.update_lda 增量更新
     print("LDA模型训练完成！")
     return lda_model, corpus, dictionary
 
@@ -79,14 +79,14 @@ def visualize_topics(lda_model, corpus, dictionary):
 # --- Step 5: 主函数 ---
 def main():
     # 文件路径
-    file_path = r"D:/theguidetoculturaledconomic/数据/情感分析结果打分版本.json"
+    file_path = dataset_path('scored_comments')
 
     # 加载与预处理数据
-    processed_texts = load_and_preprocess_data(file_path)
+    load_texts, tokens_key = load_and_preprocess_data(file_path)
 
     # LDA建模
     num_topics = 10  # 设置提取的主题数
-    lda_model, corpus, dictionary = lda_topic_modeling(processed_texts, num_topics=num_topics, passes=15)
+    lda_model, corpus, dictionary = lda_topic_modeling(load_texts, tokens_key, num_topics=num_topics, passes=15)
 
     # 显示主题及其关键词概率分布
     display_topics(lda_model, num_topics=num_topics, num_words=10)
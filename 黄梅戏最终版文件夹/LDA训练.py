@@ -0,0 +1,91 @@
+import os
+import time
+
+from gensim import models
+
+from 分词缓存 import STOP_WORDS, load_tokenized_corpus
+from 数据目录 import data_path
+
+# 模型保存目录
+model_dir = data_path("LDA模型")
+
+
+def default_workers():
+    """
+    保留一个核心给主进程读取语料，其余核心用于训练。
+    """
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+# --- Step 1: 多核训练 ---
+def train_lda(corpus, dictionary, num_topics=5, passes=10, workers=None, time_budget=None,
+              random_state=42, chunksize=2000):
+    """
+    使用 LdaMulticore 多核训练 LDA。
+    time_budget（秒）不为空时按运行时间控制训练：逐轮训练，预计下一轮会超时即停止，passes 为轮数上限（None 表示不限）。
+    """
+    workers = workers or default_workers()
+    if time_budget is None:
+        print(f"多核训练LDA，主题数: {num_topics}, passes: {passes}, workers: {workers}...")
+        return models.LdaMulticore(corpus, num_topics=num_topics, id2word=dictionary, passes=passes,
+                                   workers=workers, random_state=random_state, chunksize=chunksize)
+
+    print(f"多核训练LDA，主题数: {num_topics}, 时间上限: {time_budget} 秒, workers: {workers}...")
+    start = time.perf_counter()
+    model = models.LdaMulticore(corpus, num_topics=num_topics, id2word=dictionary, passes=1,
+                                workers=workers, random_state=random_state, chunksize=chunksize)
+    completed = 1
+    while passes is None or completed < passes:
+        elapsed = time.perf_counter() - start
+        if elapsed + elapsed / completed > time_budget:
+            break
+        model.update(corpus)
+        completed += 1
+    print(f"训练完成：{completed} 轮，用时 {time.perf_counter() - start:.1f} 秒")
+    return model
+
+
+# --- Step 2: 保存、加载与增量更新 ---
+def save_lda(model, name, model_dir=model_dir):
+    os.makedirs(model_dir, exist_ok=True)
+    model_path = os.path.join(model_dir, f"{name}.lda")
+    model.save(model_path)
+    print(f"LDA模型已保存到: {model_path}")
+    return model_path
+
+
+def load_lda(model_path):
+    return models.LdaMulticore.load(model_path)
+
+
+def update_lda(model_path, new_texts):
+    """
+    用新爬取评论的分词结果在线更新已保存的模型，无需在全部历史评论上重新训练。
+    新评论按模型原有词典转为词袋，词典中没有的新词会被忽略。
+    """
+    model = load_lda(model_path)
+    new_corpus = [model.id2word.doc2bow(text) for text in new_texts]
+    new_corpus = [bow for bow in new_corpus if bow]
+    if not new_corpus:
+        print("没有可用于更新的新评论。")
+        return model
+
+    print(f"使用 {len(new_corpus)} 条新评论更新模型...")
+    model.update(new_corpus)
+    model.save(model_path)
+    print(f"更新后的模型已保存到: {model_path}")
+    return model
+
+
+# --- Step 3: 主程序：用当天新增评论更新模型 ---
+def main():
+    model_path = os.path.join(model_dir, "lda_8.lda")
+    new_comments_file = data_path("新增评论.json")
+    stop_words = STOP_WORDS
+
+    new_texts, _ = load_tokenized_corpus(new_comments_file, stop_words)
+    update_lda(model_path, new_texts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+
+from gensim import corpora
+
+from 数据目录 import data_path
+
+# 词典与词袋语料的保存目录
+artifact_dir = data_path("LDA语料")
+
+# 产物格式版本，修改构建逻辑后递增以使旧产物失效
+ARTIFACT_VERSION = 1
+
+# filter_extremes 的常用参数示例：出现少于 2 篇或超过一半评论的词被剪除，最多保留 100000 词
+DEFAULT_FILTER = {'no_below': 2, 'no_above': 0.5, 'keep_n': 100000}
+
+
+def filter_key(tokens_key, filter_params):
+    """
+    由分词缓存键、剪枝参数和产物版本生成产物文件名前缀。
+    """
+    payload = json.dumps([ARTIFACT_VERSION, tokens_key, filter_params], sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def artifact_paths(tokens_key, filter_params=None, artifact_dir=artifact_dir):
+    """
+    返回 (原始词典路径, 剪枝后词典路径, MmCorpus 路径)。
+    """
+    prefix = os.path.join(artifact_dir, f"{tokens_key[:16]}_{filter_key(tokens_key, filter_params)}")
+    raw_dictionary_path = os.path.join(artifact_dir, f"{tokens_key[:16]}_v{ARTIFACT_VERSION}.dict")
+    return raw_dictionary_path, prefix + '.dict', prefix + '.mm'
+
+
+def build_corpus_artifacts(processed_texts, tokens_key, filter_params=None, artifact_dir=artifact_dir):
+    """
+    构建或加载词典与词袋语料，返回 (dictionary, corpus)。
+    processed_texts 可以是返回分词结果的无参函数，只在产物未缓存、需要构建时才调用，命中缓存时不加载分词结果。
+    corpus 为磁盘上的 MmCorpus，训练时按文档流式读取，内存不随评论数增长。
+    filter_params 为 filter_extremes 的参数字典（如 DEFAULT_FILTER），None 表示不剪枝；
+    不同参数的剪枝结果分别缓存，调参时复用同一份原始词典。
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    raw_dictionary_path, dictionary_path, corpus_path = artifact_paths(tokens_key, filter_params, artifact_dir)
+
+    if os.path.exists(dictionary_path) and os.path.exists(corpus_path):
+        print(f"加载已缓存的词典与词袋语料: {corpus_path}")
+        return corpora.Dictionary.load(dictionary_path), corpora.MmCorpus(corpus_path)
+
+    print("\n构建词袋模型...")
+    if callable(processed_texts):
+        processed_texts = processed_texts()
+    if os.path.exists(raw_dictionary_path):
+        dictionary = corpora.Dictionary.load(raw_dictionary_path)
+    else:
+        dictionary = corpora.Dictionary(processed_texts)
+        dictionary.save(raw_dictionary_path)
+
+    if filter_params is not None:
+        print(f"剪除极端词频词: {filter_params}")
+        dictionary.filter_extremes(**filter_params)
+
+    # 逐篇转换并写入磁盘，不在内存中保留完整语料；词典最后保存，作为产物完整的标志
+    corpora.MmCorpus.serialize(corpus_path, (dictionary.doc2bow(text) for text in processed_texts))
+    dictionary.save(dictionary_path)
+    print(f"词典与词袋语料已保存到: {artifact_dir}")
+    return dictionary, corpora.MmCorpus(corpus_path)
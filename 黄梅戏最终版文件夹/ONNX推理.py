@@ -0,0 +1,246 @@
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import onnxruntime as ort
+import torch
+from onnxruntime.quantization import quantize_dynamic, QuantType
+from transformers import AutoConfig, AutoModelForSequenceClassification, BertModel, BertTokenizerFast
+
+from 数据目录 import dataset_path, data_path
+
+# ONNX 模型保存目录
+onnx_dir = data_path("ONNX模型")
+
+MODEL_NAME = 'bert-base-chinese'
+OPSET_VERSION = 14
+INPUT_NAMES = ['input_ids', 'attention_mask', 'token_type_ids']
+
+
+# --- Step 1: 导出与量化 ---
+class _ClsEncoder(torch.nn.Module):
+    """
+    只输出 CLS 位置的隐藏状态（形状为 批大小 x 1 x hidden），避免导出整段序列的隐藏状态。
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        outputs = self.model(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids)
+        return outputs.last_hidden_state[:, :1, :]
+
+
+class _Classifier(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids).logits
+
+
+def export_onnx(module, tokenizer, path, output_name):
+    """
+    导出为 ONNX，批大小和序列长度均为动态维度。
+    """
+    module.eval()
+    sample = tokenizer(["黄梅戏"], return_tensors='pt')
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in INPUT_NAMES}
+    dynamic_axes[output_name] = {0: 'batch'}
+    with torch.inference_mode():
+        torch.onnx.export(module, tuple(sample[name] for name in INPUT_NAMES), path,
+                          input_names=INPUT_NAMES, output_names=[output_name], dynamic_axes=dynamic_axes,
+                          opset_version=OPSET_VERSION)
+    print(f"ONNX 模型已导出到: {path}")
+
+
+def quantize_model(fp32_path, int8_path):
+    """
+    动态 int8 量化：权重离线量化为 int8，激活在推理时按批量化，无需校准数据。
+    """
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"int8 量化模型已保存到: {int8_path}")
+
+
+def onnx_paths(task, model_name=MODEL_NAME, onnx_dir=onnx_dir):
+    """
+    返回 (fp32 路径, int8 路径, 导出时所用 PyTorch 权重的保存目录)。
+    """
+    prefix = os.path.join(onnx_dir, f"{model_name.replace('/', '_')}_{task}")
+    return prefix + '.onnx', prefix + '.int8.onnx', prefix + '_pytorch'
+
+
+def build_onnx_model(task, model_name=MODEL_NAME, onnx_dir=onnx_dir):
+    """
+    导出并量化模型，返回 (fp32 路径, int8 路径)；已存在时直接复用。
+    task 为 'embedding'（CLS 句向量）或 'sentiment'（情感分类 logits）。
+    """
+    fp32_path, int8_path, pytorch_dir = onnx_paths(task, model_name, onnx_dir)
+    if os.path.exists(int8_path):
+        return fp32_path, int8_path
+
+    os.makedirs(onnx_dir, exist_ok=True)
+    tokenizer = BertTokenizerFast.from_pretrained(model_name)
+    if task == 'embedding':
+        model = BertModel.from_pretrained(model_name)
+        export_onnx(_ClsEncoder(model), tokenizer, fp32_path, 'last_hidden_state')
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        export_onnx(_Classifier(model), tokenizer, fp32_path, 'logits')
+    # 同时保存导出所用的权重（含分类头与标签映射），一致性检查与 ONNX 推理都以它为准
+    model.save_pretrained(pytorch_dir)
+    quantize_model(fp32_path, int8_path)
+    return fp32_path, int8_path
+
+
+# --- Step 2: ONNX Runtime 推理封装 ---
+def load_session(path, num_threads=None):
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if num_threads:
+        options.intra_op_num_threads = num_threads
+    return ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+
+class OnnxModel:
+    """
+    与 transformers 模型调用方式一致的 ONNX Runtime 封装：model(**batch) 返回带 logits 或
+    last_hidden_state 属性的结果（torch 张量），可直接替换批量打分与嵌入代码中的 PyTorch 模型。
+    """
+
+    def __init__(self, session, config):
+        self.session = session
+        self.config = config
+        self._inputs = [i.name for i in session.get_inputs()]
+        self._output = session.get_outputs()[0].name
+
+    def eval(self):
+        return self
+
+    def __call__(self, **batch):
+        feeds = {name: np.asarray(batch[name], dtype=np.int64) for name in self._inputs if name in batch}
+        output = self.session.run([self._output], feeds)[0]
+        return SimpleNamespace(**{self._output: torch.from_numpy(output)})
+
+
+class OnnxSentimentPipeline:
+    """
+    与 pipeline("sentiment-analysis") 接口一致的 ONNX 情感分类器，提供 tokenizer、model 属性，
+    调用时返回 [{'label': ..., 'score': ...}]。
+    """
+
+    def __init__(self, tokenizer, model, backend='onnx-int8'):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.backend = backend
+
+    def __call__(self, texts, truncation=True):
+        single = isinstance(texts, str)
+        batch = self.tokenizer([texts] if single else list(texts), padding=True, truncation=truncation,
+                               return_tensors='np')
+        probabilities = self.model(**batch).logits.softmax(dim=-1)
+        scores, labels = probabilities.max(dim=-1)
+        id2label = self.model.config.id2label
+        return [{'label': id2label[label], 'score': score} for label, score in zip(labels.tolist(), scores.tolist())]
+
+
+def load_onnx_classifier(model_name=MODEL_NAME, num_threads=None, quantized=True):
+    fp32_path, int8_path = build_onnx_model('sentiment', model_name)
+    id2label = AutoConfig.from_pretrained(onnx_paths('sentiment', model_name)[2]).id2label
+    config = SimpleNamespace(name_or_path=model_name, id2label=id2label, _commit_hash=None)
+    session = load_session(int8_path if quantized else fp32_path, num_threads)
+    return OnnxSentimentPipeline(BertTokenizerFast.from_pretrained(model_name), OnnxModel(session, config),
+                                 backend='onnx-int8' if quantized else 'onnx-fp32')
+
+
+def load_onnx_encoder(model_name=MODEL_NAME, num_threads=None, quantized=True):
+    """
+    返回 (tokenizer, model)，与 BERT嵌入.load_bert 的返回值一致。
+    """
+    fp32_path, int8_path = build_onnx_model('embedding', model_name)
+    session = load_session(int8_path if quantized else fp32_path, num_threads)
+    hidden_size = session.get_outputs()[0].shape[-1]
+    config = SimpleNamespace(name_or_path=model_name, hidden_size=hidden_size)
+    return BertTokenizerFast.from_pretrained(model_name), OnnxModel(session, config)
+
+
+# --- Step 3: 与 PyTorch 的一致性检查 ---
+def check_parity(texts, model_name=MODEL_NAME):
+    """
+    在同一批评论上比较 PyTorch 与 ONNX（fp32 / int8）的输出：
+    情感分类比较 logits 最大误差与标签一致率，句向量比较余弦相似度。
+    """
+    tokenizer = BertTokenizerFast.from_pretrained(model_name)
+    batch = tokenizer(list(texts), padding=True, truncation=True, max_length=128, return_tensors='pt')
+    config = SimpleNamespace(name_or_path=model_name)
+    report = {}
+
+    fp32_path, int8_path = build_onnx_model('embedding', model_name)
+    with torch.inference_mode():
+        reference = BertModel.from_pretrained(onnx_paths('embedding', model_name)[2]).eval()(**batch)
+    reference = reference.last_hidden_state[:, 0, :].numpy()
+    for name, path in (('fp32', fp32_path), ('int8', int8_path)):
+        output = OnnxModel(load_session(path), config)(**batch).last_hidden_state[:, 0, :].numpy()
+        cosine = (output * reference).sum(axis=1) / (
+            np.linalg.norm(output, axis=1) * np.linalg.norm(reference, axis=1))
+        report[f'embedding_{name}_min_cosine'] = float(cosine.min())
+        report[f'embedding_{name}_mean_cosine'] = float(cosine.mean())
+
+    # bert-base-chinese 没有预训练的分类头，参照模型必须是导出时保存的同一份权重
+    fp32_path, int8_path = build_onnx_model('sentiment', model_name)
+    with torch.inference_mode():
+        reference = AutoModelForSequenceClassification.from_pretrained(
+            onnx_paths('sentiment', model_name)[2]).eval()(**batch).logits.numpy()
+    for name, path in (('fp32', fp32_path), ('int8', int8_path)):
+        output = OnnxModel(load_session(path), config)(**batch).logits.numpy()
+        report[f'sentiment_{name}_max_logit_diff'] = float(np.abs(output - reference).max())
+        report[f'sentiment_{name}_label_agreement'] = float((output.argmax(1) == reference.argmax(1)).mean())
+
+    for key, value in report.items():
+        print(f"{key}: {value:.4f}")
+    return report
+
+
+# --- Step 4: 吞吐量与延迟基准测试 ---
+def benchmark(texts, model_name=MODEL_NAME, batch_size=32, num_threads=None):
+    """
+    比较 PyTorch、ONNX fp32 与 ONNX int8 的句向量推理：吞吐量（条/秒）与单批延迟（毫秒，中位数和 P95）。
+    """
+    from BERT嵌入 import encode_texts
+
+    results = []
+    for backend in ('torch', 'onnx-fp32', 'onnx-int8'):
+        # 预热：加载模型并触发首次推理
+        encode_texts(texts[:batch_size], model_name, batch_size, num_threads=num_threads, backend=backend)
+        latencies = []
+        for begin in range(0, len(texts), batch_size):
+            start = time.perf_counter()
+            encode_texts(texts[begin:begin + batch_size], model_name, batch_size, num_threads=num_threads,
+                         backend=backend)
+            latencies.append(time.perf_counter() - start)
+        results.append({'backend': backend, 'comments_per_s': len(texts) / sum(latencies),
+                        'batch_latency_ms': float(np.median(latencies)) * 1000,
+                        'batch_latency_p95_ms': float(np.percentile(latencies, 95)) * 1000})
+        print(f"{backend:10s} 吞吐量 {results[-1]['comments_per_s']:.1f} 条/秒, "
+              f"单批延迟 {results[-1]['batch_latency_ms']:.1f} 毫秒 (P95 {results[-1]['batch_latency_p95_ms']:.1f})")
+    return results
+
+
+# --- Step 5: 主程序 ---
+def main():
+    input_file = dataset_path('comments')
+    with open(input_file, 'r', encoding='utf-8') as f:
+        texts = [c['content'] for c in json.load(f) if c.get('content', '').strip()][:2000]
+
+    print("\n一致性检查（前 256 条评论）:")
+    check_parity(texts[:256])
+    print("\n基准测试:")
+    benchmark(texts)
+
+
+if __name__ == "__main__":
+    main()
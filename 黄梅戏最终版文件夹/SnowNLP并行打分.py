@@ -0,0 +1,73 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from snownlp import SnowNLP
+
+from 情感缓存 import package_version
+
+# 少于该条数时直接串行打分，避免进程启动开销
+MIN_PARALLEL = 2000
+
+# 每个任务块的最大评论数
+CHUNK_SIZE = 500
+
+# 缓存键中的后端名称与模型版本
+BACKEND = 'snownlp'
+MODEL_VERSION = package_version('snownlp')
+
+
+# --- 子进程初始化与打分 ---
+def _warmup():
+    """
+    子进程启动时先打分一次，提前加载 SnowNLP 的情感模型。
+    """
+    SnowNLP('黄梅戏').sentiments
+
+
+def _score_one(text):
+    try:
+        return SnowNLP(text).sentiments
+    except Exception as e:
+        print(f"情感分析出错，跳过该内容: {text[:30]}... 错误: {e}")
+        return None
+
+
+def _score_chunk(texts):
+    return [_score_one(text) for text in texts]
+
+
+# --- 并行打分 ---
+def score_texts(texts, workers=None, chunk_size=CHUNK_SIZE, min_parallel=MIN_PARALLEL):
+    """
+    使用进程池计算 SnowNLP 情感分数，返回与 texts 顺序一致的列表，出错的文本为 None。
+    文本较少或只有一个进程时串行计算。
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if len(texts) < min_parallel or workers == 1:
+        return _score_chunk(texts)
+
+    # 每个进程至少分到约 4 个任务块，使各进程负载均衡
+    chunk_size = max(1, min(chunk_size, math.ceil(len(texts) / (workers * 4))))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+    scores = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warmup) as pool:
+        for part in pool.map(_score_chunk, chunks):
+            scores.extend(part)
+    return scores
+
+
+def snownlp_scores(texts, cache=None, workers=None):
+    """
+    计算 SnowNLP 情感分数；传入缓存时只对未命中的文本打分，出错的文本为 None 且不写入缓存。
+    """
+    if cache is None:
+        return score_texts(texts, workers)
+
+    def score_fn(batch):
+        return [None if score is None else (None, score) for score in score_texts(batch, workers)]
+
+    return [None if result is None else result[1]
+            for result in cache.score(texts, score_fn, BACKEND, MODEL_VERSION)]
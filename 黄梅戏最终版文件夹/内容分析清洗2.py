@@ -1,44 +1,27 @@
 import pandas as pd
 import json
-import re
-from datetime import datetime
+
+from 文本清洗 import clean_text
+from 时间标准化 import format_records
+from 列式存储 import save_table
+from 数据目录 import dataset_path
 
 # 加载数据
-input_file = 'D:/theguidetoculturaledconomic/MediaCrawler-main/MediaCrawler-main/data/bilibili/json/search_contents_2024-12-08.json'
-output_file = 'D:/theguidetoculturaledconomic/数据/cleaned_video_data.json'
+input_file = dataset_path('raw_videos')
+output_file = dataset_path('videos')
 
 # 读取JSON文件
 with open(input_file, 'r', encoding='utf-8') as file:
     video_data = json.load(file)
 
-# 数据清洗和处理
-def clean_text(text):
-    """清洗文本，移除网址、HTML标签、表情等"""
-    # 去除网址
-    text = re.sub(r'http\S+|www\S+', '', text)
-    # 去除HTML标签
-    text = re.sub(r'<.*?>', '', text)
-    # 去除表情（表情符号通常由 Unicode 编码表示）
-    text = re.sub(r'[^\w\s,.-]', '', text)
-    # 去除多余空格
-    text = ' '.join(text.split())
-    return text
-
-def timestamp_to_date(timestamp):
-    """将毫秒时间戳转换为'年-月-日'格式"""
-    # 由于时间戳是毫秒级别，需除以1000转换为秒级别
-    timestamp = timestamp / 1000
-    # 转换为日期格式
-    return datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d')
-
 # 清洗数据
 cleaned_data = []
 for video in video_data:
     video_info = {}
     video_info['video_id'] = video.get('video_id')
-    video_info['title'] = clean_text(video.get('title', ''))
-    video_info['desc'] = clean_text(video.get('desc', ''))
-    video_info['create_time'] = timestamp_to_date(video.get('create_time', 0))
+    video_info['title'] = clean_text(video.get('title', ''), strip_symbols=True)
+    video_info['desc'] = clean_text(video.get('desc', ''), strip_symbols=True)
+    video_info['create_time'] = video.get('create_time', 0)
     video_info['user_id'] = video.get('user_id')
     video_info['nickname'] = video.get('nickname', '')
     video_info['liked_count'] = int(video.get('liked_count', 0))
@@ -48,17 +31,19 @@ for video in video_data:
     video_info['video_url'] = video.get('video_url', '')
     video_info['video_cover_url'] = video.get('video_cover_url', '')
     video_info['source_keyword'] = video.get('source_keyword', '')
-    video_info['date'] = timestamp_to_date(video.get('date', 0))
+    video_info['date'] = video.get('date', 0)
     video_info['hour'] = video.get('hour', 0)
     video_info['week'] = video.get('week', 0)
 
     # 将处理后的数据添加到列表中
     cleaned_data.append(video_info)
 
-# 将清洗后的数据保存为JSON文件
-with open(output_file, 'w', encoding='utf-8') as outfile:
-    json.dump(cleaned_data, outfile, ensure_ascii=False, indent=4)
+# 时间戳整列转换为'年-月-日'格式（自动识别秒/毫秒）
+format_records(cleaned_data, columns=('create_time', 'date'))
 
-# 输出清洗后的数据示例
+# 将清洗后的数据保存为 Parquet（按视频表结构写入）
 df = pd.DataFrame(cleaned_data)
+save_table(df, output_file, 'videos')
+
+# 输出清洗后的数据示例
 print(df.head())
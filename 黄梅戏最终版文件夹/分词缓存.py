@@ -0,0 +1,156 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import jieba
+
+from 列式存储 import load_table, resolve_path
+from 数据目录 import data_path
+
+# 分词结果缓存目录
+cache_dir = data_path("分词缓存")
+
+# 少于该条数时直接串行分词
+MIN_PARALLEL = 5000
+
+# 每个任务块的最大评论数
+CHUNK_SIZE = 2000
+
+# 话题建模与 LDA 脚本共用的停用词表
+STOP_WORDS = frozenset({'的', '了', '是', '呢', '啊', '吧', '都', '和', '着', '在', '也', '你', '我', '他', '她', '我们', '这', '那', '一个', '有', '说', '要', '到'})
+
+# 子进程中使用的停用词表
+_stop_words = frozenset()
+
+
+# --- Step 1: 缓存键 ---
+def file_hash(file_path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def jieba_dictionary_version():
+    """
+    jieba 版本号加主词典文件哈希，词典变化时缓存自动失效。
+    未调用 jieba.set_dictionary 时 jieba.dt.dictionary 为 None，使用 jieba 自带的默认词典。
+    """
+    dictionary = jieba.dt.dictionary or os.path.join(os.path.dirname(jieba.__file__), jieba.DEFAULT_DICT_NAME)
+    return f"{jieba.__version__}:{file_hash(dictionary)}"
+
+
+def corpus_cache_key(input_hash, stop_words):
+    payload = json.dumps([input_hash, sorted(stop_words), jieba_dictionary_version()], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+# --- Step 2: 多进程分词 ---
+def _init_worker(stop_words):
+    global _stop_words
+    _stop_words = frozenset(stop_words)
+    jieba.initialize()
+
+
+def _tokenize_chunk(contents):
+    processed_texts = []
+    for content in contents:
+        try:
+            tokens = jieba.cut(content)
+            processed_texts.append([word for word in tokens if word not in _stop_words and len(word) > 1])
+        except Exception as e:
+            print(f"处理文本时出错: {e}")
+            processed_texts.append([])
+    return processed_texts
+
+
+def tokenize_texts(contents, stop_words, workers=None, chunk_size=CHUNK_SIZE, min_parallel=MIN_PARALLEL):
+    """
+    使用 jieba 分词并过滤停用词和单字词，返回与 contents 顺序一致的词列表。
+    """
+    contents = list(contents)
+    workers = workers or os.cpu_count() or 1
+    if len(contents) < min_parallel or workers == 1:
+        _init_worker(stop_words)
+        return _tokenize_chunk(contents)
+
+    chunk_size = max(1, min(chunk_size, math.ceil(len(contents) / (workers * 4))))
+    chunks = [contents[i:i + chunk_size] for i in range(0, len(contents), chunk_size)]
+
+    processed_texts = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tuple(stop_words),)) as pool:
+        for part in pool.map(_tokenize_chunk, chunks):
+            processed_texts.extend(part)
+    return processed_texts
+
+
+# --- Step 3: 带缓存的语料加载 ---
+def tokenized_corpus_key(file_path, stop_words):
+    """
+    只计算分词缓存键（不读取评论、不分词），下游产物可先用它检查自己的缓存。
+    """
+    if not os.path.exists(resolve_path(file_path)):
+        raise FileNotFoundError(f"指定的文件路径不存在: {file_path}")
+    return corpus_cache_key(file_hash(resolve_path(file_path)), stop_words)
+
+
+def load_tokenized_corpus(file_path, stop_words, workers=None, cache_dir=cache_dir):
+    """
+    加载评论文件的分词结果，返回 (processed_texts, cache_key)。
+    缓存以 输入文件哈希 + 停用词表 + jieba 词典版本 为键，命中时跳过分词。
+    """
+    key = tokenized_corpus_key(file_path, stop_words)
+    cache_path = cached_corpus_path(key, cache_dir)
+    if os.path.exists(cache_path):
+        print(f"命中分词缓存: {cache_path}")
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f), key
+
+    print("\n加载评论数据...")
+    df = load_table(file_path, columns=['content'])
+
+    print("提取评论内容...")
+    contents = df['content'].dropna().tolist()
+
+    print("开始分词和停用词过滤...")
+    processed_texts = tokenize_texts(contents, stop_words, workers)
+
+    # 先写临时文件再替换，避免中断后留下不完整的缓存
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(processed_texts, f, ensure_ascii=False)
+    os.replace(cache_path + '.tmp', cache_path)
+    print(f"分词结果已缓存到: {cache_path}")
+    return processed_texts, key
+
+
+def cached_corpus_path(key, cache_dir=cache_dir):
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+# --- Step 4: 冒烟测试 ---
+def smoke_test():
+    """
+    在临时目录中对一个小评论文件分词两次：第一次写入缓存，第二次命中缓存且结果一致。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "comments.json")
+        with open(input_file, 'w', encoding='utf-8') as f:
+            json.dump([{'content': '黄梅戏天仙配唱得真好听'}, {'content': '严凤英的女驸马是经典'}, {'content': None}],
+                      f, ensure_ascii=False)
+
+        stop_words = {'的', '是'}
+        texts, key = load_tokenized_corpus(input_file, stop_words, workers=1, cache_dir=tmp)
+        assert len(texts) == 2 and all(texts), texts
+        assert os.path.exists(cached_corpus_path(key, tmp))
+        cached_texts, cached_key = load_tokenized_corpus(input_file, stop_words, workers=1, cache_dir=tmp)
+        assert (cached_texts, cached_key) == (texts, key)
+    print(f"分词缓存冒烟测试通过: {texts}")
+
+
+if __name__ == "__main__":
+    smoke_test()
@@ -0,0 +1,325 @@
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from 时间标准化 import to_datetime_column
+from 数据目录 import dataset_path
+
+# 是否在写 Parquet 的同时导出一份 JSON（供需要人工查看或旧脚本使用）
+EXPORT_JSON = False
+
+# 分类标签列使用字典编码，读入后为 pandas category
+LABEL = pa.dictionary(pa.int32(), pa.string())
+
+# 紧凑加载时转为 category 的标签、关键词列（不在表结构中的派生列也适用）
+CATEGORY_COLUMNS = ('sentiment_label', 'sentiment_category', 'source_keyword')
+
+# 内存报告中外推的数据规模（行数）
+EXTRAPOLATE_ROWS = 10000000
+
+# --- 各数据集的显式表结构 ---
+COMMENT_FIELDS = [
+    ('comment_id', pa.int64()),
+    ('content', pa.string()),
+    ('create_time', pa.timestamp('s')),
+    ('user_id', pa.int64()),
+    ('nickname', pa.string()),
+    ('avatar', pa.string()),
+    ('sub_comment_count', pa.int64()),
+    ('last_modify_ts', pa.int64()),
+    ('date', pa.date32()),
+    ('hour', pa.int8()),
+]
+
+SCHEMAS = {
+    'comments': pa.schema(COMMENT_FIELDS),
+    'scored_comments': pa.schema(COMMENT_FIELDS + [
+        ('sentiment_label', LABEL),
+        ('sentiment_score', pa.float64()),
+    ]),
+    'videos': pa.schema([
+        ('video_id', pa.int64()),
+        ('title', pa.string()),
+        ('desc', pa.string()),
+        ('create_time', pa.timestamp('s')),
+        ('user_id', pa.int64()),
+        ('nickname', pa.string()),
+        ('avatar', pa.string()),
+        ('liked_count', pa.int64()),
+        ('video_play_count', pa.int64()),
+        ('video_danmaku', pa.int64()),
+        ('video_comment', pa.int64()),
+        ('last_modify_ts', pa.int64()),
+        ('video_url', pa.string()),
+        ('video_cover_url', pa.string()),
+        ('source_keyword', LABEL),
+        ('date', pa.date32()),
+        ('hour', pa.int8()),
+        ('week', pa.int8()),
+    ]),
+    'creators': pa.schema([
+        ('user_id', pa.int64()),
+        ('nickname', pa.string()),
+        ('avatar', pa.string()),
+        ('total_fans', pa.int64()),
+        ('total_liked', pa.int64()),
+        ('user_rank', pa.int16()),
+        ('is_official', pa.int8()),
+        ('last_modify_ts', pa.date32()),
+    ]),
+    'comment_video_map': pa.schema([
+        ('comment_id', pa.int64()),
+        ('video_id', pa.int64()),
+    ]),
+    # 星型模型：评论事实表以 int32 代理键（维度表行号，-1 表示无对应行）指向两个维度表
+    'fact_comment': pa.schema([
+        ('comment_key', pa.int32()),
+        ('comment_id', pa.int64()),
+        ('video_key', pa.int32()),
+        ('creator_key', pa.int32()),
+        ('create_time', pa.timestamp('s')),
+        ('sub_comment_count', pa.int64()),
+        ('content', pa.string()),
+        ('sentiment_label', LABEL),
+        ('sentiment_score', pa.float64()),
+    ]),
+    'dim_video': pa.schema([
+        ('video_key', pa.int32()),
+        ('creator_key', pa.int32()),
+        ('video_id', pa.int64()),
+        ('create_time', pa.timestamp('s')),
+        ('liked_count', pa.int64()),
+        ('video_play_count', pa.int64()),
+        ('video_comment', pa.int64()),
+        ('video_danmaku', pa.int64()),
+    ]),
+    'dim_creator': pa.schema([
+        ('creator_key', pa.int32()),
+        ('user_id', pa.int64()),
+        ('total_fans', pa.int64()),
+        ('total_liked', pa.int64()),
+        ('user_rank', pa.int16()),
+        ('is_official', pa.int8()),
+    ]),
+    # 情感汇总立方体：小时 x 情感标签 x 视频 x 创作者，度量均可相加
+    'sentiment_cube': pa.schema([
+        ('hour', pa.timestamp('s')),
+        ('sentiment_label', LABEL),
+        ('video_id', pa.int64()),
+        ('creator_id', pa.int64()),
+        ('comment_count', pa.int64()),
+        ('score_sum', pa.float64()),
+        ('reply_sum', pa.int64()),
+    ]),
+}
+
+
+def parquet_path(path):
+    """
+    JSON 文件对应的 Parquet 文件：同目录、同名、扩展名为 .parquet。
+    """
+    return os.path.splitext(path)[0] + '.parquet'
+
+
+def resolve_path(path):
+    """
+    优先返回已存在的 Parquet 文件（JSON 比它更新时除外），否则返回原路径。
+    """
+    candidate = parquet_path(path)
+    if not os.path.exists(candidate):
+        return path
+    if os.path.exists(path) and os.path.getmtime(path) > os.path.getmtime(candidate):
+        return path
+    return candidate
+
+
+# --- Step 1: 按表结构转换类型 ---
+def apply_schema(df, schema):
+    """
+    按表结构逐列转换类型，返回 (转换后的 DataFrame, 实际使用的表结构)。
+    表结构中没有的列保留原样，由 pyarrow 推断类型。
+    """
+    df = df.copy()
+    fields = []
+    for field in schema:
+        if field.name not in df.columns:
+            continue
+        column = df[field.name]
+        if pa.types.is_integer(field.type):
+            df[field.name] = pd.to_numeric(column, errors='coerce').astype('Int64')
+        elif pa.types.is_floating(field.type):
+            df[field.name] = pd.to_numeric(column, errors='coerce').astype('float64')
+        elif pa.types.is_timestamp(field.type):
+            df[field.name] = to_datetime_column(column)
+        elif pa.types.is_date(field.type):
+            df[field.name] = to_datetime_column(column).dt.date
+        elif pa.types.is_dictionary(field.type):
+            df[field.name] = column.astype('category')
+        fields.append(field)
+    extra = [name for name in df.columns if name not in schema.names]
+    if extra:
+        inferred = pa.Schema.from_pandas(df[extra], preserve_index=False)
+        fields.extend(inferred)
+    return df, pa.schema(fields)
+
+
+# --- Step 2: 保存与加载 ---
+def save_table(df, path, schema_name=None, export_json=EXPORT_JSON):
+    """
+    按数据集表结构保存为 Parquet（path 为原 JSON 路径，自动换成 .parquet），返回 Parquet 路径。
+    export_json=True 时同时按原格式导出 JSON。
+    """
+    if schema_name is not None:
+        df, schema = apply_schema(df, SCHEMAS[schema_name])
+    else:
+        schema = None
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    output = parquet_path(path)
+    pq.write_table(table, output, compression='zstd')
+    print(f"数据已保存为 Parquet: {output}")
+    if export_json:
+        df.to_json(path, orient='records', force_ascii=False, indent=4, date_format='iso')
+        print(f"同时导出 JSON: {path}")
+    return output
+
+
+def compact_frame(df):
+    """
+    整理为紧凑类型：id 列（*_id）为 int64，其他整数列按取值范围缩小为 int8/int16/int32，
+    标签与关键词列为 category。有缺失值的整数列保留可空整数类型。
+    """
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if column in CATEGORY_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[column] = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            if not series.hasnans:
+                series = series.astype('int64')
+            if not column.endswith('_id'):
+                series = pd.to_numeric(series, downcast='integer')
+            df[column] = series
+    return df
+
+
+def _read_json(path, columns=None, schema_name=None):
+    """
+    JSON 一律不让 pandas 自动解析日期（会把秒级时间戳当作 UTC），时间列与 Parquet 一样经 to_datetime_column
+    转为北京时间：有表结构时按表结构转换，否则只转换 create_time。
+    """
+    df = pd.read_json(path, convert_dates=False)
+    df = df[columns] if columns is not None else df
+    if schema_name is not None:
+        df, _ = apply_schema(df, SCHEMAS[schema_name])
+    elif 'create_time' in df.columns:
+        df['create_time'] = to_datetime_column(df['create_time'])
+    return df
+
+
+def load_table(path, columns=None, schema_name=None):
+    """
+    加载数据集：同名 Parquet 存在时只读取需要的列，否则回退到 JSON。
+    传入表结构名称时整理为紧凑类型（JSON 先按表结构转换，如字符串 "97" 转为整数）。
+    """
+    resolved = resolve_path(path)
+    if resolved.endswith('.parquet'):
+        df = pd.read_parquet(resolved, columns=columns)
+    else:
+        df = _read_json(path, columns, schema_name)
+    return compact_frame(df) if schema_name is not None else df
+
+
+def frame_to_records(df, fmt='%Y-%m-%d %H:%M:%S'):
+    """
+    DataFrame 转为记录列表：时间转为字符串，缺失值为 None，可直接 json.dump。
+    """
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime(fmt)
+        elif pd.api.types.infer_dtype(df[column], skipna=True) == 'date':
+            df[column] = pd.to_datetime(df[column]).dt.strftime('%Y-%m-%d')
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict('records')
+
+
+def load_records(path, columns=None, schema_name=None, fmt='%Y-%m-%d %H:%M:%S'):
+    """
+    以记录列表形式加载数据集（逐条处理的脚本使用）。应传入 schema_name，JSON 与 Parquet 两种来源才得到相同的记录。
+    """
+    return frame_to_records(load_table(path, columns, schema_name), fmt)
+
+
+def check_records_match(path, schema_name, columns=None):
+    """
+    检查同一数据集从 JSON 和从 Parquet 读取得到的记录完全一致（时间、类型与缺失值）。
+    """
+    from_json = frame_to_records(compact_frame(_read_json(path, columns, schema_name)))
+    from_parquet = frame_to_records(compact_frame(pd.read_parquet(parquet_path(path), columns=columns)))
+    mismatched = sum(a != b for a, b in zip(from_json, from_parquet)) + abs(len(from_json) - len(from_parquet))
+    if mismatched:
+        raise ValueError(f"{os.path.basename(path)}: JSON 与 Parquet 读取结果有 {mismatched} 条记录不一致")
+    print(f"{os.path.basename(path)}: JSON 与 Parquet 读取的 {len(from_json)} 条记录一致")
+
+
+def memory_report(path, schema_name, columns=None):
+    """
+    对比原加载方式（pd.read_json 读取全部列，类型自动推断）与紧凑加载（按表结构、只读 columns）的内存，
+    并按每行字节数外推到 EXTRAPOLATE_ROWS 行。
+    """
+    before = pd.read_json(path) if os.path.exists(path) else pd.read_parquet(parquet_path(path))
+    after = load_table(path, columns, schema_name)
+    before_bytes = before.memory_usage(deep=True).sum()
+    after_bytes = after.memory_usage(deep=True).sum()
+    rows = max(len(before), 1)
+    print(f"{os.path.basename(path)}（{len(before)} 行）: 原方式 {before.shape[1]} 列 {before_bytes / 2 ** 20:.2f} MB，"
+          f"紧凑加载 {after.shape[1]} 列 {after_bytes / 2 ** 20:.2f} MB（{after_bytes / max(before_bytes, 1):.0%}）")
+    print(f"  外推到 {EXTRAPOLATE_ROWS} 行: 原方式约 {before_bytes / rows * EXTRAPOLATE_ROWS / 2 ** 30:.2f} GB，"
+          f"紧凑加载约 {after_bytes / rows * EXTRAPOLATE_ROWS / 2 ** 30:.2f} GB")
+    print("  " + ", ".join(f"{name}: {dtype}" for name, dtype in after.dtypes.items()))
+
+
+# --- Step 3: 把已有 JSON 数据集转换为 Parquet，并对比加载耗时 ---
+def convert_json(path, schema_name):
+    df = pd.read_json(path, convert_dates=False)
+    return save_table(df, path, schema_name, export_json=False)
+
+
+def compare_load_time(path, columns=None):
+    start = time.perf_counter()
+    pd.read_json(path)
+    json_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pd.read_parquet(parquet_path(path), columns=columns)
+    parquet_elapsed = time.perf_counter() - start
+    print(f"{os.path.basename(path)}: JSON {json_elapsed:.3f} 秒, Parquet {parquet_elapsed:.3f} 秒 "
+          f"({json_elapsed / max(parquet_elapsed, 1e-9):.1f} 倍)")
+
+
+def main():
+    # 数据目录中的数据集名称 -> (表结构名称, 典型分析脚本读取的列)
+    datasets = {
+        'comments': ('comments', ['comment_id', 'user_id', 'create_time', 'sub_comment_count', 'content']),
+        'scored_comments': ('scored_comments', ['comment_id', 'create_time', 'sentiment_label', 'sentiment_score']),
+        'videos': ('videos', ['video_id', 'liked_count', 'video_play_count', 'source_keyword']),
+        'creators': ('creators', ['user_id', 'total_fans']),
+        'mapping': ('comment_video_map', None),
+    }
+    for name, (schema_name, columns) in datasets.items():
+        path = dataset_path(name)
+        if not os.path.exists(path):
+            print(f"跳过不存在的文件: {path}")
+            continue
+        convert_json(path, schema_name)
+        check_records_match(path, schema_name)
+        compare_load_time(path)
+        memory_report(path, schema_name, columns)
+
+
+if __name__ == "__main__":
+    main()
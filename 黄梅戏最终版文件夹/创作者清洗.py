@@ -1,15 +1,9 @@
 import json
 import pandas as pd
-from datetime import datetime, timezone
 
-# 时间戳转日期函数
-def convert_timestamp(timestamp):
-    """
-    将时间戳（毫秒级）转换为'年-月-日'格式，并返回
-    """
-    # 如果时间戳是毫秒级的，需要除以1000
-    timestamp = timestamp / 1000  # 转换为秒级
-    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')  # 使用带时区支持的方式
+from 时间标准化 import to_datetime_column
+from 列式存储 import save_table
+from 数据目录 import dataset_path
 
 # 读取 JSON 数据函数
 def load_json(file_path):
@@ -41,8 +35,7 @@ def clean_data(input_file, output_file):
         cleaned_creator['user_rank'] = creator.get('user_rank')
         cleaned_creator['is_official'] = creator.get('is_official')
 
-        # 处理时间戳
-        cleaned_creator['last_modify_ts'] = convert_timestamp(creator.get('last_modify_ts'))
+        cleaned_creator['last_modify_ts'] = creator.get('last_modify_ts')
 
         # 将清洗后的数据加入列表
         cleaned_creators.append(cleaned_creator)
@@ -50,15 +43,19 @@ def clean_data(input_file, output_file):
     # 转换为 Pandas DataFrame 以便分析
     df = pd.DataFrame(cleaned_creators)
 
-    # 保存清洗后的数据到文件
-    df.to_json(output_file, orient='records', force_ascii=False, indent=4)
+    # 处理时间戳：整列转换为'年-月-日'格式
+    df['last_modify_ts'] = to_datetime_column(df['last_modify_ts']).dt.strftime('%Y-%m-%d')
+
+    # 保存清洗后的数据（Parquet，按创作者表结构写入）
+    save_table(df, output_file, 'creators')
 
     # 打印出部分数据以验证清洗效果
     print(df.head())
 
 # 输入和输出文件路径
-input_file = r"D:\theguidetoculturaledconomic\MediaCrawler-main\MediaCrawler-main\data\bilibili\json\search_creators_2024-12-08.json"
-output_file = r"D:\theguidetoculturaledconomic\数据\cleaned_creators.json"
+input_file = dataset_path('raw_creators')
+output_file = dataset_path('creators')
 
 # 运行数据清洗程序
-clean_data(input_file, output_file)
+if __name__ == "__main__":
+    clean_data(input_file, output_file)
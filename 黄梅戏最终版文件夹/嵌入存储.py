@@ -0,0 +1,130 @@
+import json
+import os
+
+import numpy as np
+
+from 数据目录 import data_path
+
+# 嵌入存储根目录，每个模型一个子目录
+store_root = data_path("评论嵌入")
+
+# 初始容量（行数），写满后容量翻倍
+INITIAL_CAPACITY = 1024
+
+
+class EmbeddingStore:
+    """
+    按 comment_id 持久化的评论嵌入存储。
+    嵌入保存在预留容量的 .npy 文件中，以内存映射方式读写；comment_id 按行号保存在 ids.npy 中。
+    每个 (模型, 评论) 只计算一次，新评论增量追加，下游 KMeans、相似度检索等直接零拷贝读取。
+    """
+
+    def __init__(self, directory, dim, dtype='float32'):
+        self.directory = directory
+        self.embeddings_path = os.path.join(directory, 'embeddings.npy')
+        self.ids_path = os.path.join(directory, 'ids.npy')
+        self.meta_path = os.path.join(directory, 'meta.json')
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+            if self.meta['dim'] != dim or self.meta['dtype'] != np.dtype(dtype).name:
+                raise ValueError(f"嵌入存储 {directory} 的维度或类型与请求不一致: {self.meta}")
+            self._ids = np.load(self.ids_path)
+        else:
+            self.meta = {'dim': dim, 'dtype': np.dtype(dtype).name, 'rows': 0, 'capacity': 0}
+            self._ids = np.empty(0, dtype=np.int64)
+        self._sorted = None
+
+    @classmethod
+    def for_model(cls, model_name, dim=768, dtype='float32', root=store_root):
+        return cls(os.path.join(root, model_name.replace('/', '_')), dim, dtype)
+
+    @property
+    def rows(self):
+        return self.meta['rows']
+
+    # --- 读取 ---
+    def matrix(self):
+        """
+        返回全部嵌入的只读内存映射视图（不复制数据）。
+        """
+        if self.rows == 0:
+            return np.empty((0, self.meta['dim']), dtype=self.meta['dtype'])
+        return np.load(self.embeddings_path, mmap_mode='r')[:self.rows]
+
+    def ids(self):
+        return self._ids
+
+    def lookup(self, comment_ids):
+        """
+        返回 comment_ids 对应的行号数组，不存在的评论为 -1。
+        """
+        comment_ids = np.asarray(comment_ids, dtype=np.int64)
+        if self._sorted is None:
+            order = np.argsort(self._ids, kind='stable')
+            self._sorted = (self._ids[order], order)
+        sorted_ids, order = self._sorted
+        if len(sorted_ids) == 0:
+            return np.full(len(comment_ids), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(sorted_ids, comment_ids), len(sorted_ids) - 1)
+        return np.where(sorted_ids[positions] == comment_ids, order[positions], -1)
+
+    # --- 写入 ---
+    def _ensure_capacity(self, rows):
+        capacity = self.meta['capacity']
+        if rows <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, capacity)
+        while new_capacity < rows:
+            new_capacity *= 2
+        tmp_path = self.embeddings_path + '.tmp'
+        grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=self.meta['dtype'],
+                                          shape=(new_capacity, self.meta['dim']))
+        if self.rows:
+            grown[:self.rows] = self.matrix()
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self.embeddings_path)
+        self.meta['capacity'] = new_capacity
+
+    def append(self, comment_ids, embeddings):
+        """
+        追加新评论的嵌入，已存在的 comment_id 会被跳过。返回实际追加的条数。
+        """
+        comment_ids = np.asarray(comment_ids, dtype=np.int64)
+        embeddings = np.asarray(embeddings)
+        _, first = np.unique(comment_ids, return_index=True)
+        first = np.sort(first)
+        keep = first[self.lookup(comment_ids[first]) < 0]
+        if len(keep) == 0:
+            return 0
+
+        start = self.rows
+        end = start + len(keep)
+        self._ensure_capacity(end)
+        stored = np.load(self.embeddings_path, mmap_mode='r+')
+        stored[start:end] = embeddings[keep].astype(self.meta['dtype'], copy=False)
+        stored.flush()
+        del stored
+
+        self._ids = np.concatenate([self._ids, comment_ids[keep]])
+        self._sorted = None
+        np.save(self.ids_path, self._ids)
+        self.meta['rows'] = end
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        return len(keep)
+
+    def get_or_compute(self, comment_ids, texts, embed_fn):
+        """
+        返回 comment_ids 对应的行号数组；缺少嵌入的评论先用 embed_fn(文本列表) 计算并追加。
+        """
+        comment_ids = np.asarray(comment_ids, dtype=np.int64)
+        missing = np.flatnonzero(self.lookup(comment_ids) < 0)
+        if len(missing):
+            print(f"计算 {len(missing)} 条新评论的嵌入（已有 {self.rows} 条）...")
+            texts = list(texts)
+            self.append(comment_ids[missing], embed_fn([texts[i] for i in missing]))
+        return self.lookup(comment_ids)
@@ -0,0 +1,186 @@
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from 黄梅戏弹幕清洗 import load_danmaku, output_dir
+from 数据目录 import data_path
+
+# 结果保存路径
+density_file = data_path("弹幕密度.npz")
+
+# 每个统计区间的播放时长（秒）
+BIN_SECONDS = 10
+# 高能片段：区间弹幕数的 z 分数不低于阈值，且弹幕数不少于 MIN_PEAK_COUNT
+Z_THRESHOLD = 2.0
+MIN_PEAK_COUNT = 5
+
+# 是否运行合成数据性能测试（2000 万条弹幕，需要数百 MB 内存），平时关闭
+RUN_BENCHMARK = False
+
+# 所有视频的密度直方图按 CSR 方式存放：第 i 个视频的区间计数为 counts[indptr[i]:indptr[i + 1]]，
+# 第 j 个区间覆盖播放时间 [j * bin_seconds, (j + 1) * bin_seconds)
+DensityTimeline = namedtuple('DensityTimeline', ['video_ids', 'indptr', 'counts', 'bin_seconds'])
+
+# 高能片段：视频序号、起止区间（不含 end_bin）、片段内弹幕数、最大 z 分数，均为等长数组
+PeakSegments = namedtuple('PeakSegments', ['video_index', 'start_bin', 'end_bin', 'count', 'max_z'])
+
+
+# --- Step 1: 读取弹幕 ---
+def load_offsets(video_col=None, dataset_dir=output_dir):
+    """
+    读取 (视频 id, 显示位置)。清洗结果中没有 video_col 列（或未指定）时，全部弹幕视为同一个视频。
+    """
+    names = pq.ParquetDataset(dataset_dir).schema.names
+    if video_col is not None and video_col not in names:
+        print(f"弹幕数据中没有列 {video_col}，按单个视频处理")
+        video_col = None
+    columns = ["显示位置"] + ([video_col] if video_col else [])
+    df = load_danmaku(columns=columns, output_dir=dataset_dir)
+    video_ids = df[video_col].to_numpy() if video_col else np.zeros(len(df), dtype=np.int64)
+    return video_ids, df["显示位置"].to_numpy(dtype=np.float64)
+
+
+# --- Step 2: 密度直方图 ---
+def density_histograms(video_ids, offsets, bin_seconds=BIN_SECONDS):
+    """
+    一次计算所有视频的弹幕密度：factorize 视频 id，再对 (视频起始位置 + 区间号) 做一次 bincount。
+    显示位置缺失或为负的弹幕忽略；每个视频的区间数由其最大显示位置决定。
+    """
+    offsets = np.asarray(offsets, dtype=np.float64)
+    valid = np.isfinite(offsets) & (offsets >= 0)
+    codes, uniques = pd.factorize(np.asarray(video_ids)[valid], sort=True)
+    bins = (offsets[valid] // bin_seconds).astype(np.int64)
+
+    n_bins = np.zeros(len(uniques), dtype=np.int64)
+    np.maximum.at(n_bins, codes, bins + 1)
+    indptr = np.concatenate(([0], np.cumsum(n_bins)))
+    counts = np.bincount(indptr[codes] + bins, minlength=indptr[-1]).astype(np.int32)
+    return DensityTimeline(np.asarray(uniques), indptr, counts, bin_seconds)
+
+
+def video_density(timeline, video_index):
+    """
+    单个视频的 (区间起始秒数, 弹幕数)，可直接用于绘图。
+    """
+    begin, end = timeline.indptr[video_index], timeline.indptr[video_index + 1]
+    return np.arange(end - begin) * timeline.bin_seconds, timeline.counts[begin:end]
+
+
+# --- Step 3: 高能片段 ---
+def bin_video_index(timeline):
+    """
+    每个区间所属的视频序号。
+    """
+    return np.repeat(np.arange(len(timeline.video_ids)), np.diff(timeline.indptr))
+
+
+def zscores(timeline):
+    """
+    每个区间弹幕数在所在视频内的 z 分数（均值、标准差用 reduceat 按视频分段计算），标准差为 0 的视频为 0。
+    """
+    counts = timeline.counts.astype(np.float64)
+    starts = timeline.indptr[:-1]
+    n_bins = np.diff(timeline.indptr)
+    mean = np.add.reduceat(counts, starts) / n_bins
+    variance = np.add.reduceat(counts ** 2, starts) / n_bins - mean ** 2
+    std = np.sqrt(np.maximum(variance, 0))
+
+    owner = bin_video_index(timeline)
+    scores = np.zeros_like(counts)
+    nonzero = std[owner] > 0
+    scores[nonzero] = (counts[nonzero] - mean[owner][nonzero]) / std[owner][nonzero]
+    return scores
+
+
+def detect_peaks(timeline, z_threshold=Z_THRESHOLD, min_count=MIN_PEAK_COUNT):
+    """
+    标记高能区间并把同一视频内相邻的高能区间合并为片段。
+    """
+    scores = zscores(timeline)
+    is_peak = (scores >= z_threshold) & (timeline.counts >= min_count)
+    owner = bin_video_index(timeline)
+
+    # 片段起点：本区间是高能区间，且是视频的第一个区间或前一个区间不是高能区间
+    video_start = np.zeros(len(is_peak), dtype=bool)
+    video_start[timeline.indptr[:-1]] = True
+    previous = np.concatenate(([False], is_peak[:-1])) & ~video_start
+    starts = np.flatnonzero(is_peak & ~previous)
+    following = np.concatenate((is_peak[1:], [False]))
+    following[timeline.indptr[1:] - 1] = False
+    ends = np.flatnonzero(is_peak & ~following) + 1
+
+    cumulative = np.concatenate(([0], np.cumsum(timeline.counts, dtype=np.int64)))
+    # 非高能区间置为 -inf，reduceat 从每个片段起点到下一个片段起点取最大值即为片段内最大值
+    peak_scores = np.where(is_peak, scores, -np.inf)
+    max_z = np.maximum.reduceat(peak_scores, starts) if len(starts) else np.zeros(0)
+    return PeakSegments(owner[starts], starts - timeline.indptr[owner[starts]],
+                        ends - timeline.indptr[owner[starts]], cumulative[ends] - cumulative[starts], max_z)
+
+
+# --- Step 4: 保存与读取 ---
+def save_timeline(timeline, peaks, file_path=density_file):
+    np.savez(file_path, video_ids=timeline.video_ids, indptr=timeline.indptr, counts=timeline.counts,
+             bin_seconds=timeline.bin_seconds, **{f"peak_{name}": value for name, value in peaks._asdict().items()})
+    print(f"弹幕密度已保存到: {file_path}")
+
+
+def load_timeline(file_path=density_file):
+    with np.load(file_path, allow_pickle=True) as data:
+        timeline = DensityTimeline(data['video_ids'], data['indptr'], data['counts'], int(data['bin_seconds']))
+        peaks = PeakSegments(*(data[f"peak_{name}"] for name in PeakSegments._fields))
+    return timeline, peaks
+
+
+def print_top_peaks(timeline, peaks, top_n=10):
+    order = np.argsort(-peaks.count)[:top_n]
+    for i in order:
+        begin = peaks.start_bin[i] * timeline.bin_seconds
+        end = peaks.end_bin[i] * timeline.bin_seconds
+        print(f"视频 {timeline.video_ids[peaks.video_index[i]]}: {begin // 60}:{begin % 60:02d} - "
+              f"{end // 60}:{end % 60:02d}，{peaks.count[i]} 条弹幕，z = {peaks.max_z[i]:.1f}")
+
+
+# --- Step 5: 性能测试 ---
+def benchmark(n_danmaku=20000000, n_videos=5000, bin_seconds=BIN_SECONDS):
+    rng = np.random.default_rng(42)
+    video_ids = rng.integers(10 ** 8, 10 ** 9, n_videos)[rng.integers(0, n_videos, n_danmaku)]
+    offsets = rng.gamma(2.0, 300.0, n_danmaku)
+    print(f"合成数据: {n_danmaku} 条弹幕, {n_videos} 个视频")
+
+    start = time.perf_counter()
+    timeline = density_histograms(video_ids, offsets, bin_seconds)
+    histogram_elapsed = time.perf_counter() - start
+    peaks = detect_peaks(timeline)
+    print(f"密度直方图 {histogram_elapsed:.2f} 秒，高能片段检测 {time.perf_counter() - start - histogram_elapsed:.2f} 秒，"
+          f"共 {len(timeline.counts)} 个区间、{len(peaks.count)} 个高能片段")
+
+
+def build_timeline(dataset_dir=output_dir, output_file=density_file, video_col=None, bin_seconds=BIN_SECONDS):
+    """
+    读取清洗后的弹幕，计算各视频密度直方图与高能片段并保存。
+    """
+    video_ids, offsets = load_offsets(video_col, dataset_dir)
+    timeline = density_histograms(video_ids, offsets, bin_seconds)
+    peaks = detect_peaks(timeline)
+    print(f"{len(timeline.video_ids)} 个视频，{len(peaks.count)} 个高能片段")
+    print_top_peaks(timeline, peaks)
+    save_timeline(timeline, peaks, output_file)
+    return timeline, peaks
+
+
+def main():
+    if os.path.exists(output_dir):
+        build_timeline()
+    else:
+        print(f"弹幕清洗结果不存在，请先运行 黄梅戏弹幕清洗.py: {output_dir}")
+
+    if RUN_BENCHMARK:
+        benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,48 @@
-import json
+import time
+import pandas as pd
+import torch
 from transformers import pipeline
 from tqdm import tqdm
 import os
 
+from 情感缓存 import SentimentCache
+from 列式存储 import load_records, save_table
+from 数据目录 import dataset_path, data_path
+
 # 1. 禁用符号链接警告（可选）
 os.environ['HF_HUB_DISABLE_SYMLINKS_WARNING'] = '1'
 
 # 2. 定义输入和输出文件路径
-input_file = r"D:\theguidetoculturaledconomic\数据\cleaned_comments.json"
-output_file = r"D:\theguidetoculturaledconomic\数据\情感分析结果2.json"
+input_file = dataset_path('comments')
+output_file = data_path("情感分析结果2.json")
+
+# 批量推理参数：每批评论数、PyTorch 线程数（None 表示使用默认值）
+BATCH_SIZE = 32
+NUM_THREADS = None
+# 推理后端：'torch'（transformers pipeline）、'onnx-int8'（动态量化的 ONNX Runtime）或 'onnx-fp32'
+BACKEND = 'torch'
 
 # 3. 加载 Hugging Face 中文情感分析模型
-def load_classifier():
+def load_classifier(backend=BACKEND, num_threads=NUM_THREADS):
     try:
-        print("Loading BERT-based sentiment analysis model...")
-        classifier = pipeline("sentiment-analysis", model="bert-base-chinese")
+        print(f"Loading BERT-based sentiment analysis model ({backend})...")
+        if backend == 'torch':
+            classifier = pipeline("sentiment-analysis", model="bert-base-chinese")
+        else:
+            from ONNX推理 import load_onnx_classifier
+            classifier = load_onnx_classifier("bert-base-chinese", num_threads, quantized=backend == 'onnx-int8')
         print("Model loaded successfully.")
         return classifier
     except Exception as e:
         print(f"Error loading model: {e}")
         exit(1)
 
-# 4. 加载 JSON 数据
-def load_json(file_path):
+# 4. 加载评论数据（优先读取同名 Parquet）
+def load_comments(file_path):
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_records(file_path, schema_name='comments')
     except Exception as e:
-        print(f"Error loading JSON file: {e}")
+        print(f"Error loading comments: {e}")
         exit(1)
 
 # 5. 处理评论文本（确保不超过 512 tokens）
@@ -56,29 +71,102 @@ def process_comments(comments, classifier):
         results.append(comment)
     return results
 
-# 6. 保存分析结果到 JSON 文件
-def save_json(data, file_path):
+# 5.1 批量打分：按 token 长度分桶、动态填充，返回与 texts 顺序一致的 (label, score)
+#     超出模型最大长度或出错的评论返回 None（逐条模式下同样记为 unknown）
+def score_texts_batched(texts, classifier, batch_size=BATCH_SIZE):
+    tokenizer = classifier.tokenizer
+    model = classifier.model
+    model.eval()
+    id2label = model.config.id2label
+    max_length = tokenizer.model_max_length
+
+    # 一次性分词（不填充），按 token 长度排序，使同一批内长度相近
+    encodings = tokenizer(texts)
+    lengths = [len(ids) for ids in encodings['input_ids']]
+    order = sorted(range(len(texts)), key=lengths.__getitem__)
+    order = [i for i in order if lengths[i] <= max_length]
+
+    results = [None] * len(texts)
+    start = time.perf_counter()
+    with torch.inference_mode():
+        for begin in tqdm(range(0, len(order), batch_size), desc="Processing batches", ncols=100):
+            batch_indices = order[begin:begin + batch_size]
+            features = [{key: encodings[key][i] for key in encodings.keys()} for i in batch_indices]
+            try:
+                # 动态填充：只填充到本批最长评论的长度
+                batch = tokenizer.pad(features, return_tensors='pt')
+                probabilities = model(**batch).logits.softmax(dim=-1)
+                best_scores, best_labels = probabilities.max(dim=-1)
+            except Exception as e:
+                print(f"Error processing batch: {e}")
+                continue
+            for i, score, label in zip(batch_indices, best_scores.tolist(), best_labels.tolist()):
+                results[i] = (id2label[label], score)
+    elapsed = time.perf_counter() - start
+    if elapsed > 0:
+        print(f"Scored {len(texts)} comments in {elapsed:.1f}s ({len(texts) / elapsed:.1f} comments/s)")
+    return results
+
+# 5.2 批量处理评论：结果与逐条模式一致且保持原顺序；传入缓存时只对未命中的评论打分
+def process_comments_batched(comments, classifier, batch_size=BATCH_SIZE, num_threads=NUM_THREADS, cache=None):
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    # 与逐条模式相同：跳过空文本，按字符截断
+    results = [comment for comment in comments if comment.get('content', '').strip()]
+    texts = [comment.get('content', '')[:512] for comment in results]
+
+    def score_fn(batch):
+        return score_texts_batched(batch, classifier, batch_size)
+
+    if cache is None:
+        scored = score_fn(texts)
+    else:
+        scored = cache.score(texts, score_fn, 'bert', model_version(classifier))
+
+    # 将分析结果保存到原始评论数据中（原顺序）
+    for comment, result in zip(results, scored):
+        sentiment_label, sentiment_score = result if result is not None else ('unknown', 0.0)
+        comment['sentiment_label'] = sentiment_label
+        comment['sentiment_score'] = sentiment_score
+    return results
+
+# 5.3 缓存键中的模型版本：模型名 + 权重提交哈希（ONNX 后端再加上后端名）
+def model_version(classifier):
+    config = classifier.model.config
+    version = f"{config.name_or_path}@{getattr(config, '_commit_hash', None) or 'local'}"
+    backend = getattr(classifier, 'backend', 'torch')
+    return version if backend == 'torch' else f"{version}+{backend}"
+
+# 6. 保存分析结果（Parquet，按打分评论表结构写入）
+def save_results(data, file_path):
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        save_table(pd.DataFrame(data), file_path, 'scored_comments')
         print(f"Sentiment analysis results saved to: {file_path}")
     except Exception as e:
-        print(f"Error saving JSON file: {e}")
+        print(f"Error saving results: {e}")
         exit(1)
 
-# 7. 主函数（使用 Windows 多进程安全保护）
-if __name__ == '__main__':
+# 7. 完整流程：加载模型与数据、打分并保存
+def run(input_file=input_file, output_file=output_file, backend=BACKEND):
     # 加载模型
-    classifier = load_classifier()
+    classifier = load_classifier(backend)
 
     # 加载输入数据
     print("Loading input data...")
-    comments_data = load_json(input_file)
+    comments_data = load_comments(input_file)
 
     # 执行情感分析
     print("Starting sentiment analysis...")
-    analyzed_comments = process_comments(comments_data, classifier)
+    cache = SentimentCache()
+    analyzed_comments = process_comments_batched(comments_data, classifier, cache=cache)
+    cache.print_stats()
+    cache.close()
 
     # 保存结果
-    save_json(analyzed_comments, output_file)
+    save_results(analyzed_comments, output_file)
     print("Sentiment analysis completed successfully!")
+
+# 8. 主函数（使用 Windows 多进程安全保护）
+if __name__ == '__main__':
+    run()
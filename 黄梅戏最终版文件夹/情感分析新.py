@@ -5,6 +5,9 @@ from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 import os
 
+from 列式存储 import load_records
+from 数据目录 import dataset_path, data_path
+
 # 0. 禁用符号链接警告（可选）
 os.environ['HF_HUB_DISABLE_SYMLINKS_WARNING'] = '1'
 
@@ -22,14 +25,13 @@ def query(payload):
 vader_analyzer = SentimentIntensityAnalyzer()
 
 # 3. 读取评论数据
-input_file = r"D:\theguidetoculturaledconomic\数据\cleaned_comments.json"
-output_file = r"D:\theguidetoculturaledconomic\数据\情感分析结果.json"
+input_file = dataset_path('comments')
+output_file = data_path("情感分析结果.json")
 
 
-# 读取原始JSON文件
+# 读取清洗后的评论（优先读取同名 Parquet）
 def load_json(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_records(file_path, schema_name='comments')
 
 
 # 4. 对长文本进行切分，确保每个文本片段的token数量不超过512
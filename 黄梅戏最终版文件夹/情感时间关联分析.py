@@ -3,53 +3,53 @@ from datetime import datetime
 import matplotlib.pyplot as plt
 import seaborn as sns
 from tqdm import tqdm
-import numpy as np
 
-# 1. 数据加载与时间戳转换
-def load_and_preprocess_data(input_file):
-    print("加载数据并处理时间戳...")
-    df = pd.read_json(input_file)
+from 情感汇总立方体 import update_cube, rollup, cube_file, cube_ids_file
+from 时间标准化 import update_date_dimension, date_dimension_file
+from 数据目录 import dataset_path, data_path
 
-    # 时间戳转换为标准时间
-    df['create_time'] = pd.to_datetime(df['create_time'], unit='s')
-    df['day'] = df['create_time'].dt.date
-    df['hour'] = df['create_time'].dt.hour
-    df['week'] = df['create_time'].dt.isocalendar().week
+# 情感标签对应的中文类别
+SENTIMENT_MAP = {'LABEL_0': '负向', 'LABEL_1': '中性', 'LABEL_2': '正向'}
 
-    # 映射情感标签
-    sentiment_map = {'LABEL_0': '负向', 'LABEL_1': '中性', 'LABEL_2': '正向'}
-    df['sentiment_category'] = df['sentiment_label'].map(sentiment_map)
+# 1. 更新并加载情感汇总立方体（只汇总新增的已打分评论）
+def load_and_preprocess_data(fact_file, video_dim_file, creator_dim_file, cube_file=cube_file, ids_file=cube_ids_file):
+    print("更新情感汇总立方体...")
+    return update_cube(fact_file, video_dim_file, creator_dim_file, cube_file, ids_file)
 
-    # 添加模拟互动数据
-    df['like_count'] = np.random.randint(0, 100, size=len(df))  # 点赞数
-    df['share_count'] = np.random.randint(0, 50, size=len(df))  # 分享数
-
-    print("时间戳处理完成！")
-    return df
-
-# 2. 按时间段统计情感分布和平均情感强度
-def calculate_sentiment_summary(df):
+# 2. 按时间段统计情感分布和平均情感强度（从立方体按天上卷，不再逐组计算）
+def calculate_sentiment_summary(cube, granularity='day', dimension=None):
     print("按时间段统计情感分布和平均强度...")
-    sentiment_summary = df.groupby('day').agg({
-        'sentiment_category': lambda x: x.value_counts(normalize=True).to_dict(),
-        'sentiment_score': 'mean',
-        'like_count': 'sum',
-        'share_count': 'sum'
-    }).reset_index()
+    if dimension is None:
+        dimension = update_date_dimension(cube['hour'])
+    by_label = rollup(cube, granularity, dimension=dimension)
+    # 占比只在 SENTIMENT_MAP 中的类别之间计算（打分出错的 unknown 不计入），平均分数仍按全部评论
+    by_label = by_label[by_label['sentiment_label'].isin(list(SENTIMENT_MAP))]
+    counts = by_label.pivot_table(index='period', columns='sentiment_label', values='comment_count',
+                                  aggfunc='sum', fill_value=0, observed=True)
+    shares = counts.div(counts.sum(axis=1), axis=0).rename(columns=SENTIMENT_MAP)
+
+    totals = rollup(cube, granularity, by=(), dimension=dimension).set_index('period')
+    sentiment_summary = pd.DataFrame({
+        'day': totals.index,
+        # 每个时间段各情感类别的占比，只保留出现过的类别
+        'sentiment_category': [{k: v for k, v in row.items() if v > 0}
+                               for row in shares.reindex(totals.index).to_dict('records')],
+        'sentiment_score': totals['score_mean'].to_numpy(),
+        'sub_comment_count': totals['reply_sum'].to_numpy(),
+    })
     print("统计完成！")
     return sentiment_summary
 
-# 3. 滑动窗口分析情感强度波动
-def sliding_window_analysis(df, window='1D'):
+# 3. 滑动窗口分析情感强度波动（小时粒度的条数与分数总和按窗口重采样）
+def sliding_window_analysis(cube, window='1D', dimension=None):
     print(f"进行滑动窗口分析，窗口大小: {window}...")
 
-    # 确保 create_time 是索引并且按时间升序排列
-    df = df.sort_index()
-    df = df.set_index('create_time')  # 确保时间列为索引
-
-    # 使用 resample 按时间窗口聚合数据
-    sliding_df = df['sentiment_score'].resample(window).mean().reset_index()
-    sliding_df.rename(columns={'sentiment_score': 'sentiment_score_avg'}, inplace=True)
+    hourly = rollup(cube, 'hour', by=(), dimension=dimension).set_index('period')
+    resampled = hourly[['score_sum', 'comment_count']].resample(window).sum()
+    sliding_df = pd.DataFrame({
+        'create_time': resampled.index,
+        'sentiment_score_avg': (resampled['score_sum'] / resampled['comment_count'].where(resampled['comment_count'] > 0)).to_numpy(),
+    })
 
     print("滑动窗口分析完成！")
     return sliding_df
@@ -83,18 +83,18 @@ def save_results_to_json(sentiment_summary, output_file):
     print("结果保存成功！")
 
 # 6. 主函数
-def main():
-    input_file = r"D:/theguidetoculturaledconomic/数据/情感分析结果打分版本.json"
-    output_file = r"D:/theguidetoculturaledconomic/数据/情感与时间关联分析.json"
-
-    df = load_and_preprocess_data(input_file)
+def main(fact_file=dataset_path('fact_comment'), video_dim_file=dataset_path('dim_video'),
+         creator_dim_file=dataset_path('dim_creator'), output_file=data_path("情感与时间关联分析.json"), cube_file=cube_file, ids_file=cube_ids_file,
+         date_dimension_file=date_dimension_file):
+    cube = load_and_preprocess_data(fact_file, video_dim_file, creator_dim_file, cube_file, ids_file)
+    dimension = update_date_dimension(cube['hour'], date_dimension_file)
 
     print("处理中...")
     for _ in tqdm(range(100), desc="数据分析中", ncols=100):
         pass
 
-    sentiment_summary = calculate_sentiment_summary(df)
-    sliding_df = sliding_window_analysis(df.copy(), window='1D')
+    sentiment_summary = calculate_sentiment_summary(cube, dimension=dimension)
+    sliding_df = sliding_window_analysis(cube, window='1D', dimension=dimension)
 
     visualize_results(sentiment_summary, sliding_df)
     save_results_to_json(sentiment_summary, output_file)
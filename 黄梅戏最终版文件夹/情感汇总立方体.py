@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from 星型模型 import load_comment_facts, fact_file, video_dim_file, creator_dim_file
+from 评论视频映射 import IdIndex, MISSING
+from 时间标准化 import attach_date_dimension
+from 列式存储 import load_table, save_table, resolve_path
+from 数据目录 import dataset_path
+
+# 立方体与已汇总评论索引（comment_id -> 行哈希）的保存路径
+cube_file = dataset_path('sentiment_cube')
+cube_ids_file = dataset_path('sentiment_cube_ids')
+
+# 立方体的维度与可加的度量；均值由 总和 / 条数 得到，因此各粒度上卷后仍然精确。
+# 视频与创作者用原始 id 而不是维度表代理键：代理键是维度表行号，重建星型模型后会变化
+DIMENSIONS = ['hour', 'sentiment_label', 'video_id', 'creator_id']
+MEASURES = ['comment_count', 'score_sum', 'reply_sum']
+
+# 参与汇总的评论字段，任一字段变化都会改变评论的行哈希
+FACT_COLUMNS = DIMENSIONS + ['sentiment_score', 'sub_comment_count']
+
+# 上卷粒度 -> 共享日期维度表中的字段（按基础粒度小时的 time_key 关联）
+GRANULARITIES = {
+    'hour': 'hour_start',
+    'day': 'date',
+    'week': 'year_week',
+    'hour_of_day': 'hour',
+}
+
+
+# --- Step 1: 从事实表汇总 ---
+def load_scored_facts(fact_file=fact_file, video_dim_file=video_dim_file, creator_dim_file=creator_dim_file):
+    """
+    读取已打分评论的汇总字段：小时、情感、所属视频 video_id 与视频发布者 creator_id（找不到时为 -1）。
+    """
+    facts = load_comment_facts(['comment_id', 'create_time', 'sentiment_label', 'sentiment_score',
+                                'sub_comment_count'],
+                               video_columns=['video_id', 'creator_key'], fact_file=fact_file,
+                               video_dim_file=video_dim_file)
+    facts = facts[facts['sentiment_label'].notna() & facts['create_time'].notna()].reset_index(drop=True)
+    creators = load_table(creator_dim_file, ['user_id'], 'dim_creator')
+    creator_keys = facts['creator_key'].fillna(MISSING).to_numpy(dtype=np.int64)
+    facts['creator_id'] = creators['user_id'].array.take(creator_keys, allow_fill=True)
+    facts['video_id'] = facts['video_id'].fillna(MISSING).astype('int64')
+    facts['creator_id'] = facts['creator_id'].fillna(MISSING).astype('int64')
+    facts['hour'] = facts['create_time'].dt.floor('h')
+    return facts[['comment_id'] + FACT_COLUMNS]
+
+
+def row_hashes(facts):
+    """
+    每条评论汇总字段的 64 位哈希，用于发现重新打分或重新关联的评论。
+    """
+    return pd.util.hash_pandas_object(facts[FACT_COLUMNS], index=False).to_numpy().view(np.int64)
+
+
+def aggregate(facts):
+    """
+    一次 groupby 把评论汇总为 小时 x 情感标签 x 视频 x 创作者 的基础立方体。
+    """
+    cube = facts.groupby(DIMENSIONS, observed=True, sort=False).agg(
+        comment_count=('comment_id', 'size'),
+        score_sum=('sentiment_score', 'sum'),
+        reply_sum=('sub_comment_count', 'sum'),
+    )
+    return cube.reset_index()
+
+
+def merge_cubes(cube, new_cube):
+    """
+    度量均可相加，合并时对相同维度组合直接求和。
+    """
+    if cube is None or cube.empty:
+        return new_cube
+    merged = pd.concat([cube, new_cube], ignore_index=True)
+    return merged.groupby(DIMENSIONS, observed=True, sort=False)[MEASURES].sum().reset_index()
+
+
+# --- Step 2: 增量更新 ---
+def load_cube(file_path=cube_file):
+    return load_table(file_path, schema_name='sentiment_cube')
+
+
+def update_cube(fact_file=fact_file, video_dim_file=video_dim_file, creator_dim_file=creator_dim_file,
+                output_file=cube_file, ids_file=cube_ids_file, rebuild=False):
+    """
+    只汇总尚未计入立方体的已打分评论，与已有立方体合并后保存。
+    已汇总评论的行哈希与 ids_file 中的记录不一致（重新打分、重新关联视频）或评论已删除时自动全量重建。
+    """
+    facts = load_scored_facts(fact_file, video_dim_file, creator_dim_file)
+    current = IdIndex.from_pairs(facts['comment_id'], row_hashes(facts))
+
+    cube = None
+    processed = IdIndex(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    if not rebuild and os.path.exists(resolve_path(output_file)) and os.path.exists(ids_file):
+        recorded = IdIndex.load(ids_file)
+        stale = (current.lookup(recorded.keys) != recorded.values).sum()
+        if stale:
+            print(f"{stale} 条已汇总评论被修改或删除，全量重建情感立方体")
+        else:
+            cube = load_cube(output_file)
+            processed = recorded
+
+    new = facts[processed.lookup(facts['comment_id']) == MISSING]
+    print(f"新增已打分评论 {len(new)} 条（已汇总 {len(processed)} 条）")
+
+    if len(new) or cube is None:
+        cube = merge_cubes(cube, aggregate(new))
+        save_table(cube, output_file, 'sentiment_cube')
+        current.save(ids_file)
+    print(f"情感立方体共 {len(cube)} 个单元格")
+    return cube
+
+
+# --- Step 3: 查询 ---
+def select(cube, video_ids=None, creator_ids=None):
+    """
+    按视频 id 或创作者 user_id 切片。
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    if video_ids is not None:
+        mask &= cube['video_id'].isin(video_ids).to_numpy()
+    if creator_ids is not None:
+        mask &= cube['creator_id'].isin(creator_ids).to_numpy()
+    return cube[mask]
+
+
+def rollup(cube, granularity='day', by=('sentiment_label',), dimension=None):
+    """
+    把基础立方体上卷到 granularity（hour / day / week / hour_of_day）x by，并计算平均情感分数。
+    时间段取自日期维度表 dimension（默认为持久化的共享维度表）。
+    """
+    field = GRANULARITIES[granularity]
+    period = attach_date_dimension(cube[['hour']], dimension, column='hour', fields=(field,))[field]
+    grouped = cube.assign(period=period.to_numpy()).groupby(['period', *by], observed=True)[MEASURES].sum().reset_index()
+    grouped['score_mean'] = grouped['score_sum'] / grouped['comment_count']
+    return grouped
+
+
+def main():
+    cube = update_cube()
+    for granularity in ('day', 'week', 'hour_of_day'):
+        print(f"\n按 {granularity} 汇总:")
+        print(rollup(cube, granularity).head(10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import hashlib
+import sqlite3
+import time
+from importlib import metadata
+
+from 数据目录 import data_path
+
+# 缓存文件路径
+cache_file = data_path("情感缓存.sqlite")
+
+# 缓存最多保留的条目数，超出后按最近使用时间淘汰
+MAX_ENTRIES = 2000000
+
+# SQLite 单条语句的参数个数上限以内的分批大小
+_QUERY_CHUNK = 500
+
+
+def normalize_text(text):
+    """
+    缓存键使用的文本标准化：合并空白字符。
+    """
+    return ' '.join(str(text).split())
+
+
+def text_hash(text):
+    return hashlib.sha1(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def package_version(name):
+    """
+    返回已安装包的版本号，作为模型版本的一部分写入缓存键。
+    """
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+class SentimentCache:
+    """
+    以 (backend, model_version, 文本哈希) 为键的情感打分磁盘缓存。
+    SnowNLP 与 BERT 各打分路径在打分前先查询缓存，只对未命中的文本打分。
+    """
+
+    def __init__(self, path=cache_file, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment (
+                backend TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                label TEXT,
+                score REAL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (backend, model_version, text_hash)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_last_used ON sentiment (last_used)")
+        self.conn.commit()
+
+    def get_many(self, backend, model_version, hashes):
+        """
+        批量查询，返回 {文本哈希: (label, score)}，并刷新命中条目的最近使用时间。
+        """
+        found = {}
+        hashes = list(hashes)
+        for start in range(0, len(hashes), _QUERY_CHUNK):
+            chunk = hashes[start:start + _QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT text_hash, label, score FROM sentiment "
+                f"WHERE backend = ? AND model_version = ? AND text_hash IN ({placeholders})",
+                [backend, model_version, *chunk])
+            for h, label, score in rows:
+                found[h] = (label, score)
+        if found:
+            now = int(time.time())
+            self.conn.executemany(
+                "UPDATE sentiment SET last_used = ? WHERE backend = ? AND model_version = ? AND text_hash = ?",
+                [(now, backend, model_version, h) for h in found])
+            self.conn.commit()
+        return found
+
+    def put_many(self, backend, model_version, items):
+        """
+        写入 {文本哈希: (label, score)}，写入后按容量淘汰最久未使用的条目。
+        """
+        now = int(time.time())
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sentiment (backend, model_version, text_hash, label, score, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(backend, model_version, h, label, score, now) for h, (label, score) in items.items()])
+        self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM sentiment WHERE rowid IN "
+                "(SELECT rowid FROM sentiment ORDER BY last_used LIMIT ?)", (overflow,))
+            self.conn.commit()
+        return max(overflow, 0)
+
+    def score(self, texts, score_fn, backend, model_version):
+        """
+        返回与 texts 顺序一致的 (label, score) 列表。
+        score_fn 接收未命中文本列表，返回等长的 (label, score) 列表；返回 None 的条目视为打分失败，不写入缓存。
+        """
+        hashes = [text_hash(text) for text in texts]
+        results = self.get_many(backend, model_version, set(hashes))
+
+        # 同一文本只打分一次
+        pending = {}
+        for h, text in zip(hashes, texts):
+            if h in results:
+                self.hits += 1
+            else:
+                self.misses += 1
+                pending.setdefault(h, text)
+
+        if pending:
+            scored = score_fn(list(pending.values()))
+            new_items = {h: value for h, value in zip(pending, scored) if value is not None}
+            self.put_many(backend, model_version, new_items)
+            results.update(zip(pending, scored))
+        return [results[h] for h in hashes]
+
+    def stats(self):
+        total = self.hits + self.misses
+        entries = self.conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': entries,
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"情感缓存: 命中 {stats['hits']}，未命中 {stats['misses']}，"
+              f"命中率 {stats['hit_rate']:.1%}，缓存条目 {stats['entries']}")
+
+    def close(self):
+        self.conn.close()
@@ -1,54 +1,38 @@
-import pandas as pd
-import json
 import matplotlib.pyplot as plt
 import seaborn as sns
-from snownlp import SnowNLP
+
+from SnowNLP并行打分 import snownlp_scores
+from 情感缓存 import SentimentCache
+from 星型模型 import load_comment_facts
 
 # 设置中文字体支持
 import matplotlib
-
 matplotlib.rc("font", family='SimHei')  # 支持中文显示
 matplotlib.rcParams['axes.unicode_minus'] = False  # 负号正常显示
 
-# 文件路径
-comments_path = r"D:/theguidetoculturaledconomic/数据/cleaned_comments.json"
-video_path = r"D:/theguidetoculturaledconomic/数据/cleaned_video_data.json"
-mapping_path = r"D:/theguidetoculturaledconomic/数据/comment_video_map.json"
-
-
 # --- Step 1: 加载数据与预处理 ---
-def load_and_merge_data(comments_path, video_path, mapping_path):
+def load_and_merge_data():
     """
-    加载评论数据、视频数据和映射关系，进行关联合并。
+    从评论事实表读取评论，并按视频代理键取出视频数据（只读取后续分析用到的列）。
     """
-    print("加载评论数据...")
-    comments_df = pd.read_json(comments_path)
-
-    print("加载视频数据...")
-    video_df = pd.read_json(video_path)
-
-    print("加载 comment_id 与 video_id 的映射关系...")
-    with open(mapping_path, 'r', encoding='utf-8') as f:
-        mapping = json.load(f)
-    mapping_df = pd.DataFrame(mapping)
-
-    print("合并评论数据与视频数据...")
-    comments_df = comments_df.merge(mapping_df, on='comment_id', how='left')
-    merged_df = comments_df.merge(video_df, on='video_id', how='left')
-    print(f"合并后的数据共 {merged_df.shape[0]} 条记录。")
-
-    return merged_df
+    print("加载评论事实表与视频维度表...")
+    return load_comment_facts(['comment_id', 'content'],
+                              video_columns=['video_id', 'liked_count', 'video_play_count'])
 
 
 # --- Step 2: 添加情感分析 ---
-def add_sentiment_analysis(comments_df):
+def add_sentiment_analysis(comments_df, cache=None):
     """
-    使用 SnowNLP 为评论数据添加情感标签和分数。
+    使用 SnowNLP 为评论数据添加情感标签和分数（多进程打分）。打分出错的评论删除，不计入中性。
     """
     print("开始情感分析...")
     sentiment_labels = []
     sentiment_scores = []
 
+    valid_texts = [content for content in comments_df['content']
+                   if isinstance(content, str) and len(content.strip()) > 0]
+    scores = iter(snownlp_scores(valid_texts, cache))
+
     for content in comments_df['content']:
         # 过滤空值和无效内容
         if not isinstance(content, str) or len(content.strip()) == 0:
@@ -56,14 +40,21 @@ def add_sentiment_analysis(comments_df):
             sentiment_labels.append('LABEL_0')  # 标记为中性
             continue
 
-        s = SnowNLP(content)
-        score = s.sentiments
+        score = next(scores)
+        if score is None:  # 打分出错，稍后删除该行
+            sentiment_scores.append(None)
+            sentiment_labels.append(None)
+            continue
         sentiment_scores.append(score)
         sentiment_labels.append('LABEL_1' if score >= 0.5 else 'LABEL_0')
 
     # 添加新列到 DataFrame
     comments_df['sentiment_label'] = sentiment_labels
     comments_df['sentiment_score'] = sentiment_scores
+    failed = comments_df['sentiment_label'].isna()
+    if failed.any():
+        print(f"{failed.sum()} 条评论情感分析出错，已删除")
+        comments_df = comments_df[~failed]
     print("情感分析完成！")
     return comments_df
 
@@ -124,11 +115,14 @@ def visualize_comments_vs_playcount(merged_df):
 # --- Step 4: 主程序 ---
 def main():
     # 加载并合并数据
-    merged_df = load_and_merge_data(comments_path, video_path, mapping_path)
+    merged_df = load_and_merge_data()
 
     # 检查并添加情感分析
     if 'sentiment_label' not in merged_df.columns:
-        merged_df = add_sentiment_analysis(merged_df)
+        cache = SentimentCache()
+        merged_df = add_sentiment_analysis(merged_df, cache)
+        cache.print_stats()
+        cache.close()
     else:
         print("情感分析列已存在，跳过情感分析步骤。")
 
@@ -0,0 +1,128 @@
+import functools
+import json
+import os
+
+import pandas as pd
+
+# 可选的配置文件（与本模块同目录），格式如 {"data_dir": "...", "raw_dir": "...", "datasets": {"comments": "xxx.json"}}
+config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "数据目录.json")
+
+DEFAULT_DATA_DIR = r"D:\theguidetoculturaledconomic\数据"
+DEFAULT_RAW_DIR = r"D:\theguidetoculturaledconomic\MediaCrawler-main\MediaCrawler-main\data\bilibili\json"
+
+
+def _load_config():
+    if not os.path.exists(config_file):
+        return {}
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+_config = _load_config()
+
+# 数据目录与爬虫原始数据目录：环境变量 > 配置文件 > 默认值
+DATA_DIR = os.environ.get('HMX_DATA_DIR') or _config.get('data_dir') or DEFAULT_DATA_DIR
+RAW_DIR = os.environ.get('HMX_RAW_DIR') or _config.get('raw_dir') or DEFAULT_RAW_DIR
+
+# 数据集名称 -> (所在目录 'raw' / 'data', 文件名)
+DATASETS = {
+    'raw_comments': ('raw', 'search_comments_2024-12-08.json'),
+    'raw_videos': ('raw', 'search_contents_2024-12-08.json'),
+    'raw_creators': ('raw', 'search_creators_2024-12-08.json'),
+    'comments': ('data', 'cleaned_comments.json'),
+    'scored_comments': ('data', '情感分析结果打分版本.json'),
+    'videos': ('data', 'cleaned_video_data.json'),
+    'creators': ('data', 'cleaned_creators.json'),
+    'mapping': ('data', 'comment_video_map.json'),
+    'mapping_index': ('data', 'comment_video_index.npz'),
+    'fact_comment': ('data', 'fact_comment.parquet'),
+    'dim_video': ('data', 'dim_video.parquet'),
+    'dim_creator': ('data', 'dim_creator.parquet'),
+    'sentiment_cube': ('data', 'sentiment_cube.parquet'),
+    'sentiment_cube_ids': ('data', 'sentiment_cube_ids.npz'),
+    'date_dimension': ('data', '日期维度.json'),
+    'danmaku': ('data', '黄梅戏弹幕爬取.csv'),
+    'cleaned_danmaku': ('data', '清洗后的黄梅戏弹幕2.csv'),
+    'danmaku_dataset': ('data', '清洗后弹幕'),
+}
+for _name, _file_name in _config.get('datasets', {}).items():
+    DATASETS[_name] = (DATASETS.get(_name, ('data',))[0], _file_name)
+
+# 表结构名称与数据集名称不同的数据集（其余同名数据集直接使用同名表结构）
+DATASET_SCHEMAS = {'mapping': 'comment_video_map'}
+
+# 弹幕原始 CSV 没有表头
+DANMAKU_COLUMNS = ["弹幕ID", "弹幕内容", "时间", "显示位置", "用户ID"]
+
+
+# --- Step 1: 路径解析 ---
+def data_path(*parts):
+    """
+    数据目录下的路径，用于中间结果、缓存和输出文件。
+    """
+    return os.path.join(DATA_DIR, *parts)
+
+
+def dataset_path(name):
+    base, file_name = DATASETS[name]
+    return os.path.join(RAW_DIR if base == 'raw' else DATA_DIR, file_name)
+
+
+# --- Step 2: 惰性加载，同一进程内只读取一次 ---
+@functools.lru_cache(maxsize=None)
+def _load(name, columns):
+    from 列式存储 import load_table, SCHEMAS
+
+    path = dataset_path(name)
+    columns = list(columns) if columns is not None else None
+    print(f"加载数据集 {name}: {path}")
+    if name == 'danmaku':
+        return pd.read_csv(path, header=None, names=DANMAKU_COLUMNS, usecols=columns)
+    if path.endswith('.csv'):
+        return pd.read_csv(path, usecols=columns)
+    schema_name = DATASET_SCHEMAS.get(name, name)
+    return load_table(path, columns, schema_name if schema_name in SCHEMAS else None)
+
+
+def load(name, columns=None):
+    """
+    按名称加载数据集（JSON 数据集优先读取同名 Parquet，按表结构整理为紧凑类型），columns 为需要的列。
+    结果在进程内缓存；返回深拷贝，调用方可任意修改（包括原地修改已有列）而不影响缓存。
+    """
+    columns = tuple(columns) if columns is not None else None
+    return _load(name, columns).copy(deep=True)
+
+
+def _with_key(columns, key):
+    if columns is None:
+        return None
+    columns = tuple(columns)
+    return columns if key in columns else (key,) + columns
+
+
+@functools.lru_cache(maxsize=None)
+def _comment_video(comment_columns, video_columns):
+    comments = _load('comments', comment_columns)
+    mapping = _load('mapping', None)
+    videos = _load('videos', video_columns)
+    print("关联评论数据与视频数据...")
+    merged = comments.merge(mapping, on='comment_id', how='left')
+    merged = merged.merge(videos, on='video_id', how='left')
+    print(f"合并后的数据共 {merged.shape[0]} 条记录。")
+    return merged
+
+
+def comment_video_view(comment_columns=None, video_columns=None):
+    """
+    评论 x 映射 x 视频的预关联视图（左连接），同一进程内相同列组合只合并一次，返回深拷贝。
+    """
+    return _comment_video(_with_key(comment_columns, 'comment_id'),
+                          _with_key(video_columns, 'video_id')).copy(deep=True)
+
+
+def clear_cache():
+    """
+    数据文件更新后清空进程内缓存。
+    """
+    _load.cache_clear()
+    _comment_video.cache_clear()
@@ -0,0 +1,51 @@
+import re
+
+# 网址、表情符号（辅助平面字符）和 HTML 标签合并为一个预编译正则，单次扫描完成替换。
+# 与原先 网址 -> 表情 -> HTML 依次替换的结果只在标签内含网址时不同：单次扫描从左到右先匹配到整个标签，
+# 如 '<a href="http://x.com">好</a>听' 清洗为 '好听'；原实现先删网址、残留的 '<a href="' 不再构成标签，结果为 '<a href="'。
+# 这里有意采用整标签删除的结果（文本清洗性能测试.py 会列出两者不同的输入）。
+CLEAN_PATTERN = re.compile(r'http[s]?://\S+|[\U00010000-\U0010FFFF]|<.*?>')
+
+# 内容分析清洗2.py 的规则：网址按 http / www 开头匹配（不要求 ://），再去除非文字符号（含表情与标点）；
+# 网址与 HTML 标签同样单次扫描，标签内含网址时与原实现的差别同上
+STRIP_PATTERN = re.compile(r'http\S+|www\S+|<.*?>')
+SYMBOL_PATTERN = re.compile(r'[^\w\s,.-]')
+
+_clean_sub = CLEAN_PATTERN.sub
+_strip_sub = STRIP_PATTERN.sub
+_symbol_sub = SYMBOL_PATTERN.sub
+
+
+def clean_text(text, strip_symbols=False):
+    """
+    清洗文本内容，去除网址、表情、HTML标签、多余空格等。
+    strip_symbols=True 时额外去除非文字符号。
+    """
+    if not isinstance(text, str):
+        return ''
+    if strip_symbols:
+        text = _symbol_sub('', _strip_sub('', text))
+    else:
+        text = _clean_sub('', text)
+    # 去除多余的空格
+    return ' '.join(text.split())
+
+
+def clean_many(texts, strip_symbols=False):
+    """
+    批量清洗文本，返回与输入顺序一致的列表。
+    """
+    if strip_symbols:
+        return [clean_text(text, strip_symbols=True) for text in texts]
+    clean_sub = _clean_sub
+    return [' '.join(clean_sub('', text).split()) if isinstance(text, str) else '' for text in texts]
+
+
+def clean_series(series, strip_symbols=False):
+    """
+    清洗 pandas 文本列，保留原索引。缺失值清洗为空字符串。
+    """
+    import pandas as pd
+
+    return pd.Series(clean_many(series.tolist(), strip_symbols=strip_symbols),
+                     index=series.index, name=series.name)
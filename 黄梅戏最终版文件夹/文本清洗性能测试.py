@@ -0,0 +1,85 @@
+import random
+import re
+import time
+
+from 文本清洗 import clean_text, clean_many
+
+# 合成评论数量
+NUM_COMMENTS = 1000000
+
+# 最多列出多少条与原实现结果不同的输入
+MAX_SHOWN = 5
+
+# 合成评论用的片段
+FRAGMENTS = ['黄梅戏', '唱得真好', '天仙配', '女驸马', '严凤英', '好听', '太美了', '支持',
+             '第一次听', '戏曲', '传承', 'doge', '哈哈哈', '打卡', '泪目']
+EXTRAS = ['https://b23.tv/abcdEF', '<em class="keyword">黄梅戏</em>', '\U0001F602', '\U0001F44D',
+          '   ', '\n', 'http://www.bilibili.com/video/BV1xx411c7mD', '<a href="https://b23.tv/abcdEF">链接</a>']
+
+
+# 原先各清洗脚本中复制的实现，作为对照
+def legacy_clean_text(text):
+    # 去除网址
+    text = re.sub(r'http[s]?://\S+', '', text)
+    # 去除表情符号
+    text = re.sub(r'[\U00010000-\U0010FFFF]', '', text)
+    # 去除HTML标签
+    text = re.sub(r'<.*?>', '', text)
+    # 去除多余的空格
+    text = ' '.join(text.split())
+    return text
+
+
+def generate_comments(n, seed=42):
+    """
+    生成 n 条带网址、表情和 HTML 标签的合成评论。
+    """
+    rng = random.Random(seed)
+    comments = []
+    for _ in range(n):
+        parts = rng.choices(FRAGMENTS, k=rng.randint(2, 12))
+        for _ in range(rng.randint(0, 3)):
+            parts.insert(rng.randint(0, len(parts)), rng.choice(EXTRAS))
+        comments.append(' '.join(parts))
+    return comments
+
+
+def benchmark(name, func, comments):
+    start = time.perf_counter()
+    result = func(comments)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed:8.2f} 秒  {len(comments) / elapsed:12,.0f} 条/秒")
+    return result
+
+
+def main():
+    print(f"生成 {NUM_COMMENTS} 条合成评论...")
+    comments = generate_comments(NUM_COMMENTS)
+
+    print("\n清洗吞吐量对比：")
+    baseline = benchmark("原实现 (逐条 4 次处理)", lambda c: [legacy_clean_text(t) for t in c], comments)
+    single = benchmark("clean_text (逐条调用)", lambda c: [clean_text(t) for t in c], comments)
+    batch = benchmark("clean_many (批量)", clean_many, comments)
+
+    show_mismatches(comments, baseline, batch)
+    assert single == batch
+
+
+def show_mismatches(comments, baseline, result, max_shown=MAX_SHOWN):
+    """
+    统计与原实现结果不同的评论数，并列出前 max_shown 条不同的输入及两种结果。
+    """
+    mismatched = [i for i, (a, b) in enumerate(zip(baseline, result)) if a != b]
+    print(f"\n与原实现结果不一致的评论数: {len(mismatched)}")
+    shown = set()
+    for i in mismatched:
+        if comments[i] in shown:
+            continue
+        shown.add(comments[i])
+        print(f"  输入: {comments[i]!r}\n    原实现: {baseline[i]!r}\n    现实现: {result[i]!r}")
+        if len(shown) >= max_shown:
+            break
+
+
+if __name__ == '__main__':
+    main()
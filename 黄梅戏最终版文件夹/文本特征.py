@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+from gensim.matutils import Sparse2Corpus
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+from 分词缓存 import load_tokenized_corpus, tokenized_corpus_key
+from 数据目录 import data_path
+
+# 词频矩阵、TF-IDF 矩阵与词表的保存目录
+feature_dir = data_path("文本特征")
+
+# 特征格式版本，修改构建逻辑后递增以使旧特征失效
+FEATURE_VERSION = 1
+
+# 默认词表参数：出现少于 2 条或超过 85% 评论的词被剪除
+DEFAULT_PARAMS = {'min_df': 2, 'max_df': 0.85, 'max_features': None}
+
+# 关键词提取只在总词频最高的 1000 个词中选词（NMF 与 LDA 使用完整词表）
+KEYWORD_MAX_FEATURES = 1000
+
+# counts 为词频矩阵（评论 x 词），tfidf 为在其上计算的 TF-IDF 矩阵，二者共用 feature_names
+TextFeatures = namedtuple('TextFeatures', ['counts', 'tfidf', 'feature_names', 'key'])
+
+
+def _identity(tokens):
+    # 输入已经是 jieba 分好的词列表，CountVectorizer 不再做任何切分
+    return tokens
+
+
+def feature_paths(key, feature_dir=feature_dir):
+    prefix = os.path.join(feature_dir, key)
+    return prefix + '_counts.npz', prefix + '_tfidf.npz', prefix + '_vocabulary.json'
+
+
+# --- Step 1: 构建或加载特征 ---
+def load_features(file_path, stop_words, params=None, feature_dir=feature_dir):
+    """
+    对评论文件做一次 jieba 分词（复用分词缓存），拟合唯一的词表和 TF-IDF 矩阵并保存。
+    以 分词缓存键 + 词表参数 + 特征版本 为键，再次运行时直接加载。
+    关键词提取、NMF 与 LDA 共用返回的 TextFeatures。
+    """
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    tokens_key = tokenized_corpus_key(file_path, stop_words)
+    payload = json.dumps([FEATURE_VERSION, tokens_key, params], sort_keys=True)
+    key = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+    counts_path, tfidf_path, vocabulary_path = feature_paths(key, feature_dir)
+
+    if os.path.exists(vocabulary_path):
+        print(f"加载已缓存的文本特征: {vocabulary_path}")
+        with open(vocabulary_path, 'r', encoding='utf-8') as f:
+            feature_names = json.load(f)
+        return TextFeatures(sparse.load_npz(counts_path), sparse.load_npz(tfidf_path), feature_names, key)
+
+    processed_texts, _ = load_tokenized_corpus(file_path, stop_words)
+    print("\n构建词表与TF-IDF矩阵...")
+    vectorizer = CountVectorizer(analyzer=_identity, **params)
+    counts = vectorizer.fit_transform(processed_texts)
+    tfidf = TfidfTransformer().fit_transform(counts)
+    feature_names = vectorizer.get_feature_names_out().tolist()
+
+    # 词表最后保存，作为特征完整的标志
+    os.makedirs(feature_dir, exist_ok=True)
+    sparse.save_npz(counts_path, counts)
+    sparse.save_npz(tfidf_path, tfidf)
+    with open(vocabulary_path, 'w', encoding='utf-8') as f:
+        json.dump(feature_names, f, ensure_ascii=False)
+    print(f"文本特征已保存到: {feature_dir}（{counts.shape[0]} 条评论, {counts.shape[1]} 个词）")
+    return TextFeatures(counts, tfidf, feature_names, key)
+
+
+def top_feature_columns(features, max_features=None):
+    """
+    返回总词频最高的 max_features 个词的列号（按列号升序），选词规则与 CountVectorizer(max_features=...) 相同。
+    IDF 只依赖各词自身的文档频率，因此在共享 TF-IDF 矩阵上取这些列，行内排序与单独拟合受限词表一致。
+    """
+    n_features = len(features.feature_names)
+    if max_features is None or max_features >= n_features:
+        return np.arange(n_features)
+    totals = np.asarray(features.counts.sum(axis=0)).ravel()
+    # 与 CountVectorizer 相同的 argsort 调用，词频相同的词取舍也一致
+    return np.sort((-totals).argsort()[:max_features])
+
+
+# --- Step 2: 转换为 gensim 语料 ---
+def to_gensim(features):
+    """
+    返回 (corpus, id2word)：词频矩阵按行包装为 gensim 词袋语料，不复制数据。
+    """
+    corpus = Sparse2Corpus(features.counts, documents_columns=False)
+    return corpus, dict(enumerate(features.feature_names))
@@ -0,0 +1,204 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from 数据目录 import dataset_path
+
+# 统一使用北京时间（UTC+8，无夏令时），各脚本不再各自选择本地时间或 UTC
+TIMEZONE = timezone(timedelta(hours=8), 'Asia/Shanghai')
+
+# 需要标准化的时间戳列
+TIME_COLUMNS = ('create_time', 'date', 'last_modify_ts')
+
+# 绝对值大于该阈值的时间戳视为毫秒级（1e11 秒约为 5138 年，1e11 毫秒约为 1973 年）
+MS_THRESHOLD = 1e11
+
+# 日期维度表文件路径
+date_dimension_file = dataset_path('date_dimension')
+
+
+# --- Step 1: 单个时间戳转换（逐条处理的流式脚本使用） ---
+def to_local_datetime(timestamp, unit=None):
+    """
+    将秒级或毫秒级时间戳转换为北京时间 datetime，unit 为空时按数值大小自动判断。
+    """
+    value = float(timestamp)
+    if unit is None:
+        unit = 'ms' if abs(value) > MS_THRESHOLD else 's'
+    if unit == 'ms':
+        value /= 1000
+    return datetime.fromtimestamp(value, TIMEZONE)
+
+
+def convert_timestamp(timestamp, fmt='%Y-%m-%d %H:%M:%S', unit=None):
+    """
+    将时间戳转换为指定格式的北京时间字符串，空值返回 None。
+    """
+    if timestamp is None:
+        return None
+    return to_local_datetime(timestamp, unit).strftime(fmt)
+
+
+# --- Step 2: 整列向量化转换 ---
+def detect_unit(values):
+    """
+    根据整列数值的中位数判断时间戳单位，返回 's'、'ms' 或 None（无数值）。
+    """
+    numeric = pd.to_numeric(pd.Series(values), errors='coerce').dropna()
+    if numeric.empty:
+        return None
+    return 'ms' if numeric.abs().median() > MS_THRESHOLD else 's'
+
+
+def to_datetime_column(values, unit=None):
+    """
+    将一整列时间戳一次性转换为北京时间（不带时区信息的 datetime64）。
+    数值按秒/毫秒解析，已是日期字符串的值视为北京时间直接解析，无法解析的值为 NaT。
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if series.dt.tz is not None:
+            return series.dt.tz_convert(TIMEZONE).dt.tz_localize(None)
+        return series
+
+    numeric = pd.to_numeric(series, errors='coerce')
+    result = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+
+    is_numeric = numeric.notna()
+    if is_numeric.any():
+        unit = unit or detect_unit(numeric[is_numeric])
+        converted = pd.to_datetime(numeric[is_numeric], unit=unit, utc=True, errors='coerce')
+        result[is_numeric] = converted.dt.tz_convert(TIMEZONE).dt.tz_localize(None)
+
+    is_text = ~is_numeric & series.notna()
+    if is_text.any():
+        result[is_text] = pd.to_datetime(series[is_text], errors='coerce')
+    return result
+
+
+def normalize_timestamps(df, columns=TIME_COLUMNS, units=None):
+    """
+    对 DataFrame 中的时间戳列逐列向量化转换，每列独立判断秒/毫秒。
+    units 可按列名指定单位，如 {'last_modify_ts': 'ms'}。
+    """
+    units = units or {}
+    df = df.copy()
+    for column in columns:
+        if column in df.columns:
+            df[column] = to_datetime_column(df[column], units.get(column))
+    return df
+
+
+def format_records(records, columns=TIME_COLUMNS, fmt='%Y-%m-%d', default='1970-01-01'):
+    """
+    将记录列表中的时间戳字段原地转换为日期字符串，其他字段保持不变。
+    无法解析的值使用 default 填充。
+    """
+    for column in columns:
+        positions = [i for i, record in enumerate(records) if column in record]
+        if not positions:
+            continue
+        values = pd.Series([records[i][column] for i in positions])
+        formatted = to_datetime_column(values).dt.strftime(fmt).fillna(default).tolist()
+        for i, value in zip(positions, formatted):
+            records[i][column] = value
+    return records
+
+
+# --- Step 3: 共享日期维度表 ---
+def time_key(times):
+    """
+    由时间列生成小时粒度的整数键 YYYYMMDDHH，缺失值为 -1。
+    """
+    times = pd.Series(times)
+    key = (times.dt.year * 1000000 + times.dt.month * 10000
+           + times.dt.day * 100 + times.dt.hour)
+    return key.fillna(-1).astype('int64')
+
+
+def build_date_dimension(times):
+    """
+    由若干时间值构建小时粒度的日期维度表：time_key、date、hour、week（ISO 周）、year_week 等。
+    """
+    hours = to_datetime_column(times).dropna().dt.floor('h').drop_duplicates().sort_values()
+    hours = hours.reset_index(drop=True)
+    iso = hours.dt.isocalendar()
+    return pd.DataFrame({
+        'time_key': time_key(hours),
+        'hour_start': hours,
+        'date': hours.dt.strftime('%Y-%m-%d'),
+        'hour': hours.dt.hour.astype('int8'),
+        'iso_year': iso['year'].astype('int16'),
+        'week': iso['week'].astype('int8'),
+        'year_week': iso['year'].astype(str) + '-W' + iso['week'].astype(str).str.zfill(2),
+        'weekday': hours.dt.weekday.astype('int8'),
+    })
+
+
+def merge_date_dimension(dimension, times):
+    """
+    将新的时间值并入已有维度表，返回去重排序后的维度表。
+    """
+    extra = build_date_dimension(times)
+    merged = pd.concat([dimension, extra], ignore_index=True)
+    return merged.drop_duplicates('time_key').sort_values('time_key').reset_index(drop=True)
+
+
+def attach_date_dimension(df, dimension=None, column='create_time', fields=('date', 'hour', 'week')):
+    """
+    为 DataFrame 添加 time_key，并按 time_key 从维度表取出 fields 字段（按索引对齐查找，不做 merge）。
+    column 需已为 datetime 类型（见 normalize_timestamps）。未指定 dimension 时使用持久化的共享维度表，
+    并先把 df 中新出现的时间并入其中。
+    """
+    df = df.copy()
+    df['time_key'] = time_key(df[column])
+    if dimension is None:
+        dimension = update_date_dimension(df[column])
+    lookup = dimension.set_index('time_key').reindex(df['time_key'])
+    for field in fields:
+        df[field] = lookup[field].to_numpy()
+    return df
+
+
+def save_date_dimension(dimension, file_path=date_dimension_file):
+    records = dimension.drop(columns=['hour_start']).to_dict(orient='records')
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, default=int)
+    print(f"日期维度表已保存到: {file_path}")
+
+
+def load_date_dimension(file_path=date_dimension_file):
+    dimension = pd.read_json(file_path, orient='records', dtype={'date': str, 'year_week': str}, convert_dates=False)
+    dimension['hour_start'] = pd.to_datetime(dimension['date']) + pd.to_timedelta(dimension['hour'], unit='h')
+    return dimension
+
+
+def update_date_dimension(times, file_path=date_dimension_file):
+    """
+    将时间值并入持久化的日期维度表（文件不存在时新建），有新增小时才重新保存，返回完整维度表。
+    """
+    if not os.path.exists(file_path):
+        dimension = build_date_dimension(times)
+    else:
+        existing = load_date_dimension(file_path)
+        dimension = merge_date_dimension(existing, times)
+        if len(dimension) == len(existing):
+            return existing
+    save_date_dimension(dimension, file_path)
+    return dimension
+
+
+# --- Step 4: 主程序 ---
+if __name__ == '__main__':
+    input_file = dataset_path('scored_comments')
+
+    print("加载评论数据...")
+    df = pd.read_json(input_file, convert_dates=False)
+
+    print("向量化转换时间戳列...")
+    df = normalize_timestamps(df)
+
+    print("更新日期维度表...")
+    update_date_dimension(df['create_time'])
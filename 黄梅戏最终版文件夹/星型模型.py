@@ -0,0 +1,147 @@
+import os
+import tracemalloc
+
+import numpy as np
+
+from 评论视频映射 import IdIndex, MISSING
+from 列式存储 import load_table, save_table, resolve_path
+from 数据目录 import dataset_path
+
+# 输入与输出文件路径
+comments_file = dataset_path('comments')
+scored_file = dataset_path('scored_comments')
+videos_file = dataset_path('videos')
+creators_file = dataset_path('creators')
+index_file = dataset_path('mapping_index')
+fact_file = dataset_path('fact_comment')
+video_dim_file = dataset_path('dim_video')
+creator_dim_file = dataset_path('dim_creator')
+
+# 维度表只保留分析用到的数值列，头像、昵称、链接等宽字符串列不进入维度表
+VIDEO_COLUMNS = ['video_id', 'user_id', 'create_time', 'liked_count', 'video_play_count',
+                 'video_comment', 'video_danmaku']
+CREATOR_COLUMNS = ['user_id', 'total_fans', 'total_liked', 'user_rank', 'is_official']
+
+
+# --- Step 1: 维度表 ---
+def build_dimension(df, id_column, key_column):
+    """
+    按 id 去重（保留第一行）后，行号即代理键：dim.iloc[key] 就是该 key 对应的行。
+    """
+    dimension = df.drop_duplicates(subset=id_column, keep='first').reset_index(drop=True)
+    dimension.insert(0, key_column, np.arange(len(dimension), dtype=np.int32))
+    return dimension
+
+
+def surrogate_keys(dimension, id_column, ids):
+    """
+    把 id 列批量转换为维度表代理键，找不到的为 -1。
+    """
+    return IdIndex.row_index(dimension[id_column]).lookup(ids).astype(np.int32)
+
+
+def join_dimension(fact, dimension, key_column, columns, suffix=''):
+    """
+    按代理键直接从维度表取值（数组 take），不做哈希合并；键为 -1 的行取到缺失值。
+    """
+    keys = fact[key_column].to_numpy(dtype=np.int64)
+    for column in columns:
+        fact[column + suffix] = dimension[column].array.take(keys, allow_fill=True)
+    return fact
+
+
+# --- Step 2: 构建事实表 ---
+def build_star_schema(comments_file=comments_file, scored_file=scored_file, videos_file=videos_file,
+                      creators_file=creators_file, index_file=index_file, fact_file=fact_file,
+                      video_dim_file=video_dim_file, creator_dim_file=creator_dim_file):
+    """
+    评论事实表：每条评论一行（重复爬取的评论只保留一条），以 int32 代理键指向视频维度表与创作者维度表。
+    情感打分结果存在时，按 comment_id 并入事实表。
+    """
+    print("构建维度表...")
+    creators = build_dimension(load_table(creators_file, CREATOR_COLUMNS, 'creators'), 'user_id', 'creator_key')
+    videos = build_dimension(load_table(videos_file, VIDEO_COLUMNS, 'videos'), 'video_id', 'video_key')
+    videos.insert(1, 'creator_key', surrogate_keys(creators, 'user_id', videos['user_id']))
+    videos = videos.drop(columns='user_id')
+
+    print("构建评论事实表...")
+    fact = load_table(comments_file, ['comment_id', 'user_id', 'create_time', 'sub_comment_count', 'content'], 'comments')
+    fact = fact.drop_duplicates(subset='comment_id', keep='first').reset_index(drop=True)
+    fact.insert(0, 'comment_key', np.arange(len(fact), dtype=np.int32))
+
+    video_ids = IdIndex.load(index_file).lookup(fact['comment_id'])
+    fact.insert(2, 'video_key', surrogate_keys(videos, 'video_id', video_ids))
+    fact.insert(3, 'creator_key', surrogate_keys(creators, 'user_id', fact['user_id']))
+    fact = fact.drop(columns='user_id')
+
+    if os.path.exists(resolve_path(scored_file)):
+        scored = load_table(scored_file, ['comment_id', 'sentiment_label', 'sentiment_score'], 'scored_comments')
+        fact['scored_key'] = IdIndex.row_index(scored['comment_id']).lookup(fact['comment_id'])
+        join_dimension(fact, scored, 'scored_key', ['sentiment_label', 'sentiment_score'])
+        fact = fact.drop(columns='scored_key')
+
+    print(f"事实表 {len(fact)} 行，其中 {(fact['video_key'] != MISSING).sum()} 条关联到视频，"
+          f"{(fact['creator_key'] != MISSING).sum()} 条评论用户是创作者")
+    save_table(fact, fact_file, 'fact_comment')
+    save_table(videos, video_dim_file, 'dim_video')
+    save_table(creators, creator_dim_file, 'dim_creator')
+
+
+# --- Step 3: 读取 ---
+def load_comment_facts(fact_columns, video_columns=(), creator_columns=(), fact_file=fact_file,
+                       video_dim_file=video_dim_file, creator_dim_file=creator_dim_file):
+    """
+    读取事实表中需要的列，并按代理键从维度表取出需要的列（与事实表同名的维度列加后缀 _video / _creator）。
+    """
+    keys = [key for key, wanted in (('video_key', video_columns), ('creator_key', creator_columns))
+            if wanted and key not in fact_columns]
+    fact = load_table(fact_file, list(fact_columns) + keys, 'fact_comment')
+    for key, columns, path, schema_name, suffix in (
+            ('video_key', video_columns, video_dim_file, 'dim_video', '_video'),
+            ('creator_key', creator_columns, creator_dim_file, 'dim_creator', '_creator')):
+        if not columns:
+            continue
+        dimension = load_table(path, list(columns), schema_name)
+        for column in columns:
+            join_dimension(fact, dimension, key, [column], suffix if column in fact.columns else '')
+    return fact.drop(columns=keys)
+
+
+# --- Step 4: 与原合并方式对比内存 ---
+def _peak_memory(func):
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+
+def compare_memory():
+    def old_merge():
+        comments = load_table(comments_file)
+        mapping = load_table(dataset_path('mapping'))
+        videos = load_table(videos_file)
+        creators = load_table(creators_file)
+        merged = comments.merge(mapping, on='comment_id', how='left')
+        merged = merged.merge(videos, on='video_id', how='left', suffixes=('', '_video'))
+        return merged.merge(creators, on='user_id', how='left', suffixes=('', '_creator'))
+
+    def star_join():
+        return load_comment_facts(['comment_id', 'content', 'sub_comment_count'],
+                                  video_columns=['video_id', 'liked_count', 'video_play_count'],
+                                  creator_columns=['total_fans'])
+
+    for name, func in (('原 pd.merge 链', old_merge), ('星型模型', star_join)):
+        merged, peak = _peak_memory(func)
+        size = merged.memory_usage(deep=True).sum()
+        print(f"{name}: {merged.shape[0]} 行 x {merged.shape[1]} 列，结果 {size / 2 ** 20:.1f} MB，"
+              f"峰值 {peak / 2 ** 20:.1f} MB")
+
+
+def main():
+    build_star_schema()
+    compare_memory()
+
+
+if __name__ == "__main__":
+    main()
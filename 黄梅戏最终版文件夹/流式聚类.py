@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+from BERT嵌入 import encode_texts, embedding_key
+from 嵌入存储 import EmbeddingStore, store_root
+from 数据目录 import data_path
+
+# 聚类中心保存路径
+centroid_file = os.path.join(store_root, "kmeans_centroids.npz")
+
+# 每次读入内存的嵌入行数
+CHUNK_SIZE = 10000
+
+
+def _iter_chunks(matrix, rows=None, chunk_size=CHUNK_SIZE):
+    """
+    按块读取嵌入矩阵（可以是内存映射），rows 不为空时只读取指定行，每块单独复制到内存。
+    """
+    total = len(matrix) if rows is None else len(rows)
+    for begin in range(0, total, chunk_size):
+        if rows is None:
+            yield np.asarray(matrix[begin:begin + chunk_size], dtype=np.float32)
+        else:
+            yield np.asarray(matrix[rows[begin:begin + chunk_size]], dtype=np.float32)
+
+
+# --- Step 1: 流式训练 ---
+def fit_streaming(matrix, n_clusters=5, rows=None, chunk_size=CHUNK_SIZE, epochs=1, random_state=42):
+    """
+    按块对嵌入做 MiniBatchKMeans.partial_fit，整个矩阵无需同时载入内存。
+    返回聚类中心矩阵。
+    """
+    model = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, batch_size=chunk_size,
+                            n_init=3)
+    for _ in range(epochs):
+        for chunk in _iter_chunks(matrix, rows, chunk_size):
+            # 首块样本数不能少于簇数
+            if not hasattr(model, 'cluster_centers_') and len(chunk) < n_clusters:
+                continue
+            model.partial_fit(chunk)
+    if not hasattr(model, 'cluster_centers_'):
+        raise ValueError(f"样本数不足以聚成 {n_clusters} 个簇")
+    return model.cluster_centers_.astype(np.float32)
+
+
+# --- Step 2: 保存与加载聚类中心 ---
+def save_centroids(centroids, path=centroid_file):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, centroids=centroids)
+    print(f"聚类中心已保存到: {path}")
+
+
+def load_centroids(path=centroid_file):
+    return np.load(path)['centroids']
+
+
+# --- Step 3: 分配到已有聚类中心 ---
+def assign_clusters(matrix, centroids, rows=None, chunk_size=CHUNK_SIZE):
+    """
+    按块计算与各聚类中心的欧氏距离，返回每条评论最近的簇编号，无需重新训练。
+    ||x - c||^2 = ||x||^2 - 2x·c + ||c||^2，其中 ||x||^2 对同一行为常数，可省略。
+    """
+    centroids = np.asarray(centroids, dtype=np.float32)
+    centroid_norms = np.einsum('ij,ij->i', centroids, centroids)
+    labels = []
+    for chunk in _iter_chunks(matrix, rows, chunk_size):
+        distances = centroid_norms - 2 * (chunk @ centroids.T)
+        labels.append(distances.argmin(axis=1))
+    return np.concatenate(labels) if labels else np.empty(0, dtype=np.int64)
+
+
+# --- Step 4: 主程序：把当天新增评论分配到已保存的聚类中心 ---
+def main():
+    new_comments_file = data_path("新增评论.json")
+    output_file = data_path("新增评论聚类结果.json")
+
+    data = pd.read_json(new_comments_file, convert_dates=False)
+    data = data[data['content'].notna()]
+    comments = data['content'].tolist()
+
+    store = EmbeddingStore.for_model(embedding_key())
+    rows = store.get_or_compute(data['comment_id'].tolist(), comments, encode_texts)
+    centroids = load_centroids()
+    data['cluster'] = assign_clusters(store.matrix(), centroids, rows=rows)
+
+    print("\n各簇新增评论数:")
+    print(data['cluster'].value_counts().sort_index())
+    data.to_json(output_file, orient='records', force_ascii=False, indent=4)
+    print(f"聚类结果已保存到: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
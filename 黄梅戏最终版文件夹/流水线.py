@@ -0,0 +1,275 @@
+import ast
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from 分词缓存 import file_hash
+from 列式存储 import resolve_path
+from 数据目录 import DATASETS, dataset_path, data_path
+
+# 各阶段指纹与输入文件哈希的记录文件
+state_file = data_path("流水线状态.json")
+
+# 与本模块同目录的脚本为项目内模块，阶段脚本导入的项目内模块内容变化时阶段同样失效
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# 只运行这些阶段及其上游（None 表示全部）；FORCE=True 时忽略指纹全部重跑
+TARGETS = None
+FORCE = False
+# 同时运行的阶段数（None 表示 CPU 核数）
+MAX_WORKERS = None
+
+# target 为 "模块:函数"，在子进程中导入并以 (*输入路径, *输出路径, **params) 调用。
+# inputs/outputs 为数据目录中的数据集名称，或数据目录下的文件名。
+Stage = namedtuple('Stage', ['name', 'target', 'inputs', 'outputs', 'params'], defaults=((), None))
+
+STAGES = [
+    Stage('clean_comments', '评论数据清洗2:clean_data', ('raw_comments',), ('comments',)),
+    Stage('clean_videos', '内容分析清洗:clean_data', ('raw_videos',), ('videos',)),
+    Stage('clean_creators', '创作者清洗:clean_data', ('raw_creators',), ('creators',)),
+    Stage('clean_danmaku', '黄梅戏弹幕清洗:clean_chunked', ('danmaku',), ('danmaku_dataset',)),
+    Stage('mapping', '评论视频映射:build_mapping', ('raw_comments',), ('mapping', 'mapping_index')),
+    Stage('sentiment', '情感分析打分:run', ('comments',), ('scored_comments',), {'backend': 'torch'}),
+    Stage('standard_time', '标准时间3:convert_file', ('scored_comments',), ("情感分析结果_标准时间版.json",)),
+    Stage('star_schema', '星型模型:build_star_schema',
+          ('comments', 'scored_comments', 'videos', 'creators', 'mapping_index'),
+          ('fact_comment', 'dim_video', 'dim_creator')),
+    Stage('sentiment_time', '情感时间关联分析:main', ('fact_comment', 'dim_video', 'dim_creator'),
+          ("情感与时间关联分析.json", 'sentiment_cube', 'sentiment_cube_ids', 'date_dimension')),
+    Stage('danmaku_density', '弹幕密度:build_timeline', ('danmaku_dataset',), ("弹幕密度.npz",)),
+    Stage('comment_creator', '评论与创作者数据关联分析:main', ('fact_comment', 'dim_creator')),
+    Stage('interaction', '评论情感与互动数据的关联分析:main', ('fact_comment', 'dim_video')),
+]
+
+
+def stage_path(item):
+    return dataset_path(item) if item in DATASETS else data_path(item)
+
+
+# --- Step 1: 指纹 ---
+def _load_state(file_path=state_file):
+    if not os.path.exists(file_path):
+        return {'stages': {}, 'files': {}}
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_state(state, file_path=state_file):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=4)
+
+
+def _cached_hash(path, state):
+    """
+    文件内容哈希；大小和修改时间都没变时直接使用上次记录的哈希。
+    """
+    stat = os.stat(path)
+    record = state['files'].get(path)
+    if record and record[0] == stat.st_size and record[1] == stat.st_mtime_ns:
+        return record[2]
+    digest = file_hash(path)
+    state['files'][path] = [stat.st_size, stat.st_mtime_ns, digest]
+    return digest
+
+
+def _input_hash(path, state):
+    """
+    文件直接取内容哈希；目录（如分区数据集）按相对路径与各文件哈希合并。
+    """
+    if not os.path.isdir(path):
+        return _cached_hash(path, state)
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+            digest.update(_cached_hash(file_path, state).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def local_modules(module_name):
+    """
+    静态解析（不实际导入）阶段脚本及其直接、间接导入的项目内模块，返回 {模块名: 文件路径}。
+    函数体内的延迟导入（如按后端导入 ONNX推理）也计入。
+    """
+    modules = {module_name: importlib.util.find_spec(module_name).origin}
+    todo = [module_name]
+    while todo:
+        with open(modules[todo.pop()], 'rb') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                name = name.split('.')[0]
+                path = os.path.join(script_dir, f"{name}.py")
+                if name not in modules and os.path.exists(path):
+                    modules[name] = path
+                    todo.append(name)
+    return modules
+
+
+def stage_fingerprint(stage, state):
+    """
+    阶段指纹 = 阶段脚本及其导入的项目内模块内容 + 参数 + 各输入文件内容（JSON 数据集按实际读取的 Parquet 计算）。
+    输入文件不存在时抛出 FileNotFoundError。
+    """
+    module_name = stage.target.split(':')[0]
+    inputs = []
+    for item in stage.inputs:
+        path = resolve_path(stage_path(item))
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"输入文件不存在: {path}")
+        inputs.append([item, _input_hash(path, state)])
+    code = [[name, _cached_hash(path, state)] for name, path in sorted(local_modules(module_name).items())]
+    payload = json.dumps([stage.target, code, stage.params or {}, inputs], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def outputs_exist(stage):
+    return all(os.path.exists(resolve_path(stage_path(item))) for item in stage.outputs)
+
+
+# --- Step 2: 依赖关系 ---
+def select_stages(stages, targets=None):
+    """
+    只保留 targets 及其所有上游阶段，保持声明顺序。
+    """
+    if targets is None:
+        return list(stages)
+    producers = {item: stage for stage in stages for item in stage.outputs}
+    selected = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name in selected:
+            continue
+        stage = next((s for s in stages if s.name == name), None)
+        if stage is None:
+            raise ValueError(f"未知的阶段: {name}")
+        selected.add(name)
+        todo.extend(producers[item].name for item in stage.inputs if item in producers)
+    return [stage for stage in stages if stage.name in selected]
+
+
+def stage_dependencies(stages):
+    """
+    返回 {阶段名: 上游阶段名集合}，上游即产出该阶段某个输入的阶段。
+    """
+    producers = {}
+    for stage in stages:
+        for item in stage.outputs:
+            if item in producers:
+                raise ValueError(f"{item} 同时由 {producers[item]} 和 {stage.name} 产出")
+            producers[item] = stage.name
+    return {stage.name: {producers[item] for item in stage.inputs if item in producers} for stage in stages}
+
+
+# --- Step 3: 子进程执行 ---
+def _run_stage(target, args, params):
+    """
+    导入并运行阶段函数，返回运行耗时（不含在进程池中排队的时间）。
+    """
+    start = time.perf_counter()
+    module_name, func_name = target.split(':')
+    func = getattr(importlib.import_module(module_name), func_name)
+    func(*args, **params)
+    return time.perf_counter() - start
+
+
+# --- Step 4: 调度 ---
+def run_pipeline(stages=STAGES, targets=TARGETS, force=FORCE, max_workers=MAX_WORKERS, state_file=state_file):
+    """
+    按依赖顺序运行各阶段：指纹未变且输出齐全的阶段跳过，相互独立的阶段在进程池中并行。
+    某阶段失败时其下游全部跳过，其余阶段继续。返回 {阶段名: (状态, 耗时秒数)}。
+    """
+    stages = select_stages(stages, targets)
+    dependencies = stage_dependencies(stages)
+    state = _load_state(state_file)
+    report = {}
+    pending = {stage.name: stage for stage in stages}
+    running = {}
+    start_all = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # 反复扫描，直到没有新的阶段可以启动或跳过
+            progressed = True
+            while progressed:
+                progressed = False
+                for name, stage in list(pending.items()):
+                    if not dependencies[name] <= report.keys():
+                        continue
+                    del pending[name]
+                    progressed = True
+                    if any(report[dep][0] not in ('完成', '跳过') for dep in dependencies[name]):
+                        report[name] = ('上游失败', 0.0)
+                        continue
+                    try:
+                        fingerprint = stage_fingerprint(stage, state)
+                    except FileNotFoundError as e:
+                        print(f"[{name}] {e}")
+                        report[name] = ('失败', 0.0)
+                        continue
+                    if not force and state['stages'].get(name) == fingerprint and outputs_exist(stage):
+                        print(f"[{name}] 输入与参数未变化，跳过")
+                        report[name] = ('跳过', 0.0)
+                        continue
+                    print(f"[{name}] 开始运行 {stage.target}")
+                    args = [stage_path(item) for item in stage.inputs + stage.outputs]
+                    future = pool.submit(_run_stage, stage.target, args, stage.params or {})
+                    running[future] = (stage, fingerprint)
+
+            if not running:
+                if pending:
+                    raise ValueError(f"存在循环依赖: {sorted(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, fingerprint = running.pop(future)
+                try:
+                    elapsed = future.result()
+                except (Exception, SystemExit) as e:
+                    print(f"[{stage.name}] 运行失败: {e!r}")
+                    report[stage.name] = ('失败', 0.0)
+                    continue
+                print(f"[{stage.name}] 完成，耗时 {elapsed:.2f} 秒")
+                report[stage.name] = ('完成', elapsed)
+                # 每个阶段完成后立即记录，中途失败时已完成的阶段不必重跑
+                state['stages'][stage.name] = fingerprint
+                _save_state(state, state_file)
+
+    _save_state(state, state_file)
+    print_report(stages, report, time.perf_counter() - start_all)
+    return report
+
+
+def print_report(stages, report, wall_time):
+    print("\n各阶段耗时:")
+    print(f"{'阶段':<20}{'状态':<10}{'耗时(秒)':>10}")
+    for stage in stages:
+        status, elapsed = report.get(stage.name, ('未运行', 0.0))
+        print(f"{stage.name:<20}{status:<10}{elapsed:>10.2f}")
+    total = sum(elapsed for _, elapsed in report.values())
+    print(f"各阶段累计 {total:.2f} 秒，实际用时 {wall_time:.2f} 秒")
+
+
+def main():
+    # 子进程中的分析脚本不弹出图表窗口
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    run_pipeline()
+
+
+if __name__ == "__main__":
+    main()
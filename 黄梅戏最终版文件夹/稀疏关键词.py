@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+from scipy import sparse
+
+# 每块处理的行数
+BLOCK_ROWS = 100000
+
+
+# --- Step 1: 分块稀疏 top-k ---
+def top_k_per_row(matrix, k=10, block_rows=BLOCK_ROWS):
+    """
+    直接在 CSR 矩阵的 indptr/indices/data 上取每行分值最高的 k 个列，不把行展开成整个词表宽度。
+    返回 (列号矩阵, 分值矩阵)，形状均为 (行数, k)，按分值降序；非零元素不足 k 个的行用 -1 / 0 补齐。
+    分值相同时列号小的在前。
+    """
+    matrix = sparse.csr_matrix(matrix)
+    n_rows = matrix.shape[0]
+    top_columns = np.full((n_rows, k), -1, dtype=np.int64)
+    top_scores = np.zeros((n_rows, k), dtype=matrix.dtype)
+
+    for begin in range(0, n_rows, block_rows):
+        end = min(begin + block_rows, n_rows)
+        start, stop = matrix.indptr[begin], matrix.indptr[end]
+        if start == stop:
+            continue
+        data = matrix.data[start:stop]
+        columns = matrix.indices[start:stop]
+        counts = np.diff(matrix.indptr[begin:end + 1])
+        rows = np.repeat(np.arange(end - begin), counts)
+
+        # 先按行、再按分值降序排序，行内名次 = 排序后位置 - 该行起点
+        order = np.lexsort((-data, rows))
+        row_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        ranks = np.arange(len(order)) - row_starts[rows[order]]
+        keep = order[ranks < k]
+        kept_ranks = ranks[ranks < k]
+
+        top_columns[begin + rows[keep], kept_ranks] = columns[keep]
+        top_scores[begin + rows[keep], kept_ranks] = data[keep]
+    return top_columns, top_scores
+
+
+def keywords_from_matrix(matrix, feature_names, top_n=10, block_rows=BLOCK_ROWS):
+    """
+    返回每条评论的关键词列表（按 TF-IDF 降序，只包含该评论中出现过的词）。
+    """
+    feature_names = np.asarray(feature_names, dtype=object)
+    top_columns, _ = top_k_per_row(matrix, top_n, block_rows)
+    return [feature_names[row[row >= 0]].tolist() for row in top_columns]
+
+
+# --- Step 2: 性能对比 ---
+def dense_top_k(matrix, k=10):
+    """
+    旧实现：逐行展开为稠密向量后整行排序，仅用于对比。
+    """
+    results = []
+    for row in matrix:
+        row_data = row.toarray().flatten()
+        results.append(row_data.argsort()[-k:][::-1])
+    return results
+
+
+def main():
+    n_rows, vocabulary, nnz_per_row, k = 1000000, 1000, 8, 5
+    rng = np.random.default_rng(42)
+    matrix = sparse.random(n_rows, vocabulary, density=nnz_per_row / vocabulary, format='csr',
+                           random_state=rng, dtype=np.float64)
+    print(f"随机 TF-IDF 矩阵: {n_rows} 行, {vocabulary} 列, {matrix.nnz} 个非零元素")
+
+    start = time.perf_counter()
+    top_columns, top_scores = top_k_per_row(matrix, k)
+    elapsed = time.perf_counter() - start
+    print(f"分块稀疏 top-{k}: {elapsed:.2f} 秒")
+
+    # 在前 20000 行上与旧实现对比耗时与结果（只比较非零部分，旧实现在零值中的顺序不确定）
+    sample = matrix[:20000]
+    start = time.perf_counter()
+    dense = dense_top_k(sample, k)
+    dense_elapsed = time.perf_counter() - start
+    print(f"旧实现处理 20000 行: {dense_elapsed:.2f} 秒（按比例估算全量约 {dense_elapsed * n_rows / 20000:.0f} 秒）")
+
+    mismatches = 0
+    for i, columns in enumerate(dense):
+        row = sample.getrow(i).toarray().ravel()
+        expected = np.sort(row[columns])[::-1]
+        expected = expected[expected > 0]
+        if not np.allclose(top_scores[i, :len(expected)], expected) or (top_columns[i, len(expected):] >= 0).any():
+            mismatches += 1
+    print(f"结果不一致的行数: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
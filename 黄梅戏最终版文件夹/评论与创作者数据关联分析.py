@@ -1,44 +1,48 @@
-import pandas as pd
-from snownlp import SnowNLP
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib import rcParams
 
+from SnowNLP并行打分 import snownlp_scores
+from 情感缓存 import SentimentCache
+from 星型模型 import join_dimension
+from 列式存储 import load_table
+from 数据目录 import dataset_path
+
 # 设置字体为 SimHei，支持中文显示
 rcParams['font.sans-serif'] = ['SimHei']
 rcParams['axes.unicode_minus'] = False
 
 
-def load_data(comments_path, creators_path):
-    print("加载评论数据和创作者数据...")
-    comments_df = pd.read_json(comments_path)
-    creators_df = pd.read_json(creators_path)
+def load_data(fact_file, creator_dim_file):
+    print("加载评论事实表和创作者维度表...")
+    comments_df = load_table(fact_file, ['comment_id', 'creator_key', 'content'], 'fact_comment')
+    creators_df = load_table(creator_dim_file, ['total_fans'], 'dim_creator')
     return comments_df, creators_df
 
 
-def add_sentiment_label(comments_df):
+def add_sentiment_label(comments_df, cache=None):
     print("开始进行情感分析...")
     comments_df = comments_df[comments_df['content'].notna()]  # 确保 'content' 列非空
 
     sentiment_labels = []
     sentiment_scores = []
 
-    for content in comments_df['content']:
-        content = str(content).strip()
+    contents = [str(content).strip() for content in comments_df['content']]
+    scores = iter(snownlp_scores([content for content in contents if content], cache))
+
+    for content in contents:
         if not content:  # 跳过空内容
             sentiment_labels.append(None)
             sentiment_scores.append(None)
             continue
-        try:
-            s = SnowNLP(content)
-            score = s.sentiments
-            label = "LABEL_1" if score > 0.5 else "LABEL_0"
-            sentiment_labels.append(label)
-            sentiment_scores.append(score)
-        except Exception as e:
-            print(f"情感分析出错，跳过该内容: {content[:30]}... 错误: {e}")
+        score = next(scores)
+        if score is None:
             sentiment_labels.append(None)
             sentiment_scores.append(None)
+            continue
+        label = "LABEL_1" if score > 0.5 else "LABEL_0"
+        sentiment_labels.append(label)
+        sentiment_scores.append(score)
 
     comments_df['sentiment_label'] = sentiment_labels
     comments_df['sentiment_score'] = sentiment_scores
@@ -49,13 +53,15 @@ def add_sentiment_label(comments_df):
 
 def merge_data(comments_df, creators_df):
     print("\n关联评论数据与创作者数据...")
-    merged_df = pd.merge(comments_df, creators_df, on='user_id', how='left')
-    return merged_df
+    # 按创作者代理键直接取粉丝数，评论用户不是创作者时为缺失值
+    return join_dimension(comments_df.copy(), creators_df, 'creator_key', ['total_fans'])
 
 
 def classify_top_users(merged_df, fans_threshold=10000):
     print(f"\n基于粉丝数阈值 ({fans_threshold}) 进行头部用户分类...")
-    merged_df['is_top_user'] = merged_df['total_fans'].apply(lambda x: "头部用户" if x >= fans_threshold else "普通用户")
+    # 不是创作者的评论用户粉丝数缺失，按普通用户处理
+    is_top = merged_df['total_fans'].fillna(0) >= fans_threshold
+    merged_df['is_top_user'] = is_top.map({True: "头部用户", False: "普通用户"})
     return merged_df
 
 
@@ -72,12 +78,12 @@ def analyze_sentiment(merged_df):
     plt.show()
 
 
-def main():
-    comments_path = r"D:/theguidetoculturaledconomic/数据/cleaned_comments.json"
-    creators_path = r"D:/theguidetoculturaledconomic/数据/cleaned_creators.json"
-
-    comments_df, creators_df = load_data(comments_path, creators_path)
-    comments_df = add_sentiment_label(comments_df)
+def main(fact_file=dataset_path('fact_comment'), creator_dim_file=dataset_path('dim_creator')):
+    comments_df, creators_df = load_data(fact_file, creator_dim_file)
+    cache = SentimentCache()
+    comments_df = add_sentiment_label(comments_df, cache)
+    cache.print_stats()
+    cache.close()
     merged_df = merge_data(comments_df, creators_df)
     merged_df = classify_top_users(merged_df, fans_threshold=10000)
     analyze_sentiment(merged_df)
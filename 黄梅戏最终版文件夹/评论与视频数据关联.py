@@ -1,5 +1,3 @@
-import pandas as pd
-import json
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -8,59 +6,31 @@ import matplotlib
 matplotlib.rc("font", family='SimHei')  # 支持中文显示
 matplotlib.rcParams['axes.unicode_minus'] = False  # 负号正常显示
 
+from 评论视频映射 import build_mapping
+from 数据目录 import dataset_path, comment_video_view, clear_cache
+
 # 文件路径
-comments_path = r"D:/theguidetoculturaledconomic/数据/cleaned_comments.json"
-video_path = r"D:/theguidetoculturaledconomic/数据/cleaned_video_data.json"
-mapping_path = r"D:/theguidetoculturaledconomic/数据/comment_video_map.json"
+raw_comments_path = dataset_path('raw_comments')
+mapping_path = dataset_path('mapping')
+index_path = dataset_path('mapping_index')
 
 # --- Step 1: 自动生成 comment_video_map.json ---
-def generate_mapping(comments_path, video_path, output_path):
+def generate_mapping(raw_comments_path, output_path, index_path=index_path):
     """
-    从评论数据和视频数据生成 comment_id 和 video_id 的映射表。
+    按原始评论记录中的 video_id 生成 comment_id 和 video_id 的映射表（同时保存有序 id 索引）。
     """
-    print("加载评论数据和视频数据...")
-    comments_df = pd.read_json(comments_path)
-    video_df = pd.read_json(video_path)
-
-    # 确保评论数据和视频数据中都有唯一ID
     print("生成 comment_id 和 video_id 的映射关系...")
-    video_ids = video_df['video_id'].unique().tolist()
-    mapping = []
-
-    # 循环分配 video_id，确保数据类型一致
-    for idx, comment_id in enumerate(comments_df['comment_id'].unique()):
-        video_id = video_ids[idx % len(video_ids)]  # 循环分配 video_id
-        mapping.append({"comment_id": str(comment_id), "video_id": str(video_id)})
-
-    # 保存为 JSON 文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(mapping, f, ensure_ascii=False, indent=4)
-    print(f"映射关系文件已保存为: {output_path}")
+    build_mapping(raw_comments_path, output_path, index_path)
+    # 映射已更新，丢弃进程内缓存的旧映射与关联视图
+    clear_cache()
 
 # --- Step 2: 数据预处理 ---
-def load_and_merge_data(comments_path, video_path, mapping_path):
+def load_and_merge_data():
     """
-    加载评论数据、视频数据和映射关系，进行关联合并。
+    从数据目录获取评论 x 映射 x 视频的关联视图（只读取分析用到的列）。
     """
-    print("加载评论数据...")
-    comments_df = pd.read_json(comments_path)
-    comments_df['comment_id'] = comments_df['comment_id'].astype(str)  # 转换数据类型
-
-    print("加载视频数据...")
-    video_df = pd.read_json(video_path)
-    video_df['video_id'] = video_df['video_id'].astype(str)  # 转换数据类型
-
-    print("加载 comment_id 与 video_id 的映射关系...")
-    with open(mapping_path, 'r', encoding='utf-8') as f:
-        mapping = json.load(f)
-    mapping_df = pd.DataFrame(mapping)
-
-    print("关联评论数据与视频数据...")
-    # 合并映射关系
-    comments_df = comments_df.merge(mapping_df, on='comment_id', how='left')
-    # 合并视频数据
-    merged_df = comments_df.merge(video_df, on='video_id', how='left')
-    print(f"合并后的数据共 {merged_df.shape[0]} 条记录。")
+    merged_df = comment_video_view(comment_columns=['comment_id', 'content'],
+                                   video_columns=['video_id', 'video_play_count', 'liked_count'])
 
     # 检查关键字段
     if merged_df['video_id'].isna().any():
@@ -114,10 +84,10 @@ def analyze_data(merged_df):
 # --- Step 4: 主程序 ---
 def main():
     print("开始生成 comment_video_map.json 文件...")
-    generate_mapping(comments_path, video_path, mapping_path)
+    generate_mapping(raw_comments_path, mapping_path)
 
     print("加载并关联评论数据与视频数据...")
-    merged_df = load_and_merge_data(comments_path, video_path, mapping_path)
+    merged_df = load_and_merge_data()
 
     print("开始数据分析...")
     analyze_data(merged_df)
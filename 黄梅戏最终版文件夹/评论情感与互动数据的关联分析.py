@@ -9,45 +9,32 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 
+from 星型模型 import load_comment_facts
+from 列式存储 import resolve_path
+from 数据目录 import dataset_path
+
 # 配置 matplotlib 支持中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 使用 SimHei 字体显示中文
 plt.rcParams['axes.unicode_minus'] = False  # 解决负号'-'显示问题
 
 # --- Step 1: 数据加载与整合 ---
-def load_and_merge_data(sentiment_file, video_file):
+def load_and_merge_data(fact_file, video_dim_file):
     """
-    加载情感分析结果和视频互动数据，并整合为一个数据框。
+    从评论事实表读取情感分析结果，按视频代理键从视频维度表取出互动数据。
     """
-    if not os.path.exists(sentiment_file):
-        raise FileNotFoundError(f"情感分析结果文件不存在: {sentiment_file}")
-    if not os.path.exists(video_file):
-        raise FileNotFoundError(f"视频数据文件不存在: {video_file}")
-
-    print("\n加载情感分析结果...")
-    sentiment_df = pd.read_json(sentiment_file)
-
-    print("\n加载视频互动数据...")
-    video_df = pd.read_json(video_file)
+    for path in (fact_file, video_dim_file):
+        if not os.path.exists(resolve_path(path)):
+            raise FileNotFoundError(f"星型模型文件不存在，请先运行 星型模型.py: {path}")
 
-    print("\n处理视频互动数据：去重...")
-    # 确保 user_id 唯一并处理 video_id
-    video_df_unique = video_df.drop_duplicates(subset='user_id', keep='first').copy()
-    video_df_unique['video_id'] = video_df_unique['video_id'].astype(str)
+    print("\n加载评论事实表与视频互动数据...")
+    merged_df = load_comment_facts(['comment_id', 'video_key', 'sub_comment_count', 'sentiment_label', 'sentiment_score'],
+                                   video_columns=['video_id', 'liked_count', 'video_play_count'],
+                                   fact_file=fact_file, video_dim_file=video_dim_file)
 
-    print("\n映射评论到视频...")
-    # 通过 user_id 将评论数据映射到视频
-    sentiment_df['video_id'] = sentiment_df['user_id'].map(
-        video_df_unique.set_index('user_id')['video_id']
-    )
-
-    # 过滤出有效的映射结果
-    print(f"映射成功的评论数: {sentiment_df['video_id'].notnull().sum()} / {len(sentiment_df)}")
-    sentiment_df = sentiment_df.dropna(subset=['video_id']).copy()
-    sentiment_df['video_id'] = sentiment_df['video_id'].astype(str)
-
-    print("\n数据整合中...")
-    # 合并评论数据和视频数据
-    merged_df = pd.merge(sentiment_df, video_df_unique, on='video_id', how='inner')
+    # 只保留关联到视频的评论
+    matched = merged_df['video_key'] >= 0
+    print(f"映射成功的评论数: {matched.sum()} / {len(merged_df)}")
+    merged_df = merged_df[matched].drop(columns='video_key').reset_index(drop=True)
 
     # 确保数据列类型正确
     numeric_columns = ['sub_comment_count', 'liked_count', 'sentiment_score', 'video_play_count']
@@ -115,13 +102,10 @@ def visualize_results(df):
     plt.show()
 
 # --- Step 5: 主函数 ---
-def main():
-    sentiment_file = r"D:/theguidetoculturaledconomic/数据/情感分析结果打分版本.json"
-    video_file = r"D:/theguidetoculturaledconomic/数据/cleaned_video_data.json"
-
+def main(fact_file=dataset_path('fact_comment'), video_dim_file=dataset_path('dim_video')):
     try:
         # Step 1: 加载与整合数据
-        df = load_and_merge_data(sentiment_file, video_file)
+        df = load_and_merge_data(fact_file, video_dim_file)
 
         # Step 2: 执行回归分析
         perform_regression_analysis(df)
@@ -1,34 +1,22 @@
 import json
-import re
 import pandas as pd
 
 import jieba
-from datetime import datetime, timezone
 
-def convert_timestamp(timestamp):
-    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+from 文本清洗 import clean_text
+from 时间标准化 import convert_timestamp
+from 列式存储 import save_table
+from 数据目录 import dataset_path
 
 
 # 读取 JSON 数据
-input_file = r"D:\theguidetoculturaledconomic\MediaCrawler-main\MediaCrawler-main\data\bilibili\json\search_comments_2024-12-08.json"
-output_file = r"D:\theguidetoculturaledconomic\数据\cleaned_comments.json"
+input_file = dataset_path('raw_comments')
+output_file = dataset_path('comments')
 
 def load_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-# 数据清洗：去除网址、表情、HTML标签等
-def clean_text(text):
-    # 去除网址
-    text = re.sub(r'http[s]?://\S+', '', text)
-    # 去除表情符号
-    text = re.sub(r'[\U00010000-\U0010FFFF]', '', text)  # 去除所有Unicode表情符号
-    # 去除HTML标签
-    text = re.sub(r'<.*?>', '', text)
-    # 去除多余的空格
-    text = ' '.join(text.split())
-    return text
-
 # 加载原始数据
 comments_data = load_json(input_file)
 
@@ -56,8 +44,8 @@ df['create_time'] = pd.to_datetime(df['create_time'])
 df['date'] = df['create_time'].dt.date
 df['hour'] = df['create_time'].dt.hour
 
-# 保存清洗后的数据
-df.to_json(output_file, orient='records', force_ascii=False, indent=4)
+# 保存清洗后的数据（Parquet，按评论表结构写入）
+save_table(df, output_file, 'comments')
 
 # 打印出部分数据以验证清洗效果
 print(df.head())
@@ -1,15 +1,10 @@
 import json
-import re
 import pandas as pd
-from datetime import datetime, timezone
 
-# 时间戳转日期函数
-def convert_timestamp(timestamp):
-    """
-    将时间戳（毫秒级）转换为'年-月-日'格式，并返回
-    """
-    timestamp = timestamp / 1000  # 将毫秒转换为秒
-    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+from 文本清洗 import clean_text
+from 时间标准化 import to_datetime_column
+from 列式存储 import save_table
+from 数据目录 import dataset_path
 
 # 读取 JSON 数据函数
 def load_json(file_path):
@@ -19,21 +14,6 @@ def load_json(file_path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-# 数据清洗：去除网址、表情、HTML标签等
-def clean_text(text):
-    """
-    清洗文本内容，去除网址、表情、HTML标签、多余空格等
-    """
-    # 去除网址
-    text = re.sub(r'http[s]?://\S+', '', text)
-    # 去除表情符号（Unicode范围）
-    text = re.sub(r'[\U00010000-\U0010FFFF]', '', text)  # 去除所有Unicode表情符号
-    # 去除HTML标签
-    text = re.sub(r'<.*?>', '', text)
-    # 去除多余的空格
-    text = ' '.join(text.split())
-    return text
-
 # 主函数：加载、清洗并保存数据
 def clean_data(input_file, output_file):
     """
@@ -49,7 +29,7 @@ def clean_data(input_file, output_file):
         # 获取所需字段并清洗
         cleaned_comment['comment_id'] = comment.get('comment_id')
         cleaned_comment['content'] = clean_text(comment.get('content', ''))
-        cleaned_comment['create_time'] = convert_timestamp(comment.get('create_time'))
+        cleaned_comment['create_time'] = comment.get('create_time')
         cleaned_comment['user_id'] = comment.get('user_id')
         cleaned_comment['nickname'] = comment.get('nickname')
         cleaned_comment['avatar'] = comment.get('avatar')
@@ -62,20 +42,21 @@ def clean_data(input_file, output_file):
     # 转换为 Pandas DataFrame 以便分析
     df = pd.DataFrame(cleaned_comments)
 
-    # 时间处理：转换为日期格式，提取日期和小时
-    df['create_time'] = pd.to_datetime(df['create_time'])
+    # 时间处理：整列转换时间戳（自动识别秒/毫秒），提取日期和小时
+    df['create_time'] = to_datetime_column(df['create_time'])
     df['date'] = df['create_time'].dt.date
     df['hour'] = df['create_time'].dt.hour
 
-    # 保存清洗后的数据到文件
-    df.to_json(output_file, orient='records', force_ascii=False, indent=4)
+    # 保存清洗后的数据（Parquet，按评论表结构写入）
+    save_table(df, output_file, 'comments')
 
     # 打印出部分数据以验证清洗效果
     print(df.head())
 
 # 输入和输出文件路径
-input_file = r"D:\theguidetoculturaledconomic\MediaCrawler-main\MediaCrawler-main\data\bilibili\json\search_comments_2024-12-08.json"
-output_file = r"D:\theguidetoculturaledconomic\数据\cleaned_comments.json"
+input_file = dataset_path('raw_comments')
+output_file = dataset_path('comments')
 
 # 运行数据清洗程序
-clean_data(input_file, output_file)
+if __name__ == "__main__":
+    clean_data(input_file, output_file)
@@ -0,0 +1,116 @@
+import json
+import re
+
+from 文本清洗 import clean_text
+from 时间标准化 import to_local_datetime
+from 数据目录 import dataset_path, data_path
+
+# 输入和输出文件路径
+input_file = dataset_path('raw_comments')
+output_file = data_path("cleaned_comments.jsonl")
+
+# 数组元素之间的空白和逗号
+_SEPARATOR = re.compile(r'[\s,]*')
+
+# 记录被块边界截断时，解码出错位置距缓冲区末尾不超过该字符数（未闭合的字符串除外）
+_TRUNCATION_SLACK = 16
+
+
+# --- Step 1: 增量读取 JSON 数组 ---
+def iter_json_array(file_path, chunk_size=1 << 20):
+    """
+    按块读取 MediaCrawler 导出的 JSON 数组，逐条产出其中的记录。
+    内存中只保留当前读取块，与文件总大小无关。
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        started = False
+        eof = False
+        while True:
+            pos = _SEPARATOR.match(buffer, pos).end()
+            if pos < len(buffer):
+                if not started:
+                    if buffer[pos] != '[':
+                        raise ValueError(f"输入文件不是 JSON 数组: {file_path}")
+                    started = True
+                    pos += 1
+                    continue
+                if buffer[pos] == ']':
+                    return
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    # 记录被块边界截断时读取更多数据后重试；其他格式错误读再多也无法解析，立即报错
+                    if eof or not _may_be_truncated(e):
+                        raise
+                else:
+                    if end < len(buffer) or eof:
+                        yield record
+                        pos = end
+                        continue
+            elif eof:
+                raise ValueError(f"JSON 数组未正常结束: {file_path}")
+
+            # 丢弃已解析部分并读取下一块
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            if not chunk:
+                eof = True
+
+
+def _may_be_truncated(error):
+    """
+    解码错误是否可能只是因为数据不完整：出错位置在缓冲区末尾附近，或字符串一直延续到缓冲区末尾。
+    """
+    return error.msg.startswith('Unterminated string') or len(error.doc) - error.pos <= _TRUNCATION_SLACK
+
+
+# --- Step 2: 单条记录清洗 ---
+def clean_comment(comment):
+    """
+    清洗单条评论，字段与 评论数据清洗.py 的输出保持一致
+    """
+    create_time = to_local_datetime(comment.get('create_time'))
+    return {
+        'comment_id': comment.get('comment_id'),
+        'content': clean_text(comment.get('content') or ''),
+        'create_time': create_time.strftime('%Y-%m-%d %H:%M:%S'),
+        'user_id': comment.get('user_id'),
+        'nickname': comment.get('nickname'),
+        'avatar': comment.get('avatar'),
+        'sub_comment_count': comment.get('sub_comment_count'),
+        'last_modify_ts': comment.get('last_modify_ts'),
+        'date': create_time.strftime('%Y-%m-%d'),
+        'hour': create_time.hour,
+    }
+
+
+# --- Step 3: 流式清洗并写出 JSONL ---
+def stream_clean(input_file, output_file, log_every=100000):
+    """
+    逐条读取、清洗并写出评论，输出为每行一条记录的紧凑 JSONL。
+    返回写出的评论条数。
+    """
+    count = 0
+    with open(output_file, 'w', encoding='utf-8') as out:
+        for comment in iter_json_array(input_file):
+            out.write(json.dumps(clean_comment(comment), ensure_ascii=False, separators=(',', ':')))
+            out.write('\n')
+            count += 1
+            if count % log_every == 0:
+                print(f"已清洗 {count} 条评论...")
+    return count
+
+
+# --- Step 4: 主程序 ---
+def main():
+    print("开始流式清洗评论数据...")
+    count = stream_clean(input_file, output_file)
+    print(f"清洗完成，共 {count} 条评论，已保存到: {output_file}")
+
+
+if __name__ == '__main__':
+    main()
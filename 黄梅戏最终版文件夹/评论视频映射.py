@@ -0,0 +1,140 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from 评论流式清洗 import iter_json_array
+from 列式存储 import load_table, save_table
+from 数据目录 import dataset_path
+
+# 文件路径
+raw_comments_file = dataset_path('raw_comments')
+mapping_file = dataset_path('mapping')
+index_file = dataset_path('mapping_index')
+
+# 查找不到的 id 返回该值
+MISSING = -1
+
+
+def _as_ids(values):
+    """
+    转为 int64 数组并返回 (数组, 非缺失掩码)。可空整数列（如 Int64）中的缺失值先填为 MISSING。
+    """
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    valid = values.notna().to_numpy()
+    return values.to_numpy(dtype=np.int64, na_value=MISSING), valid
+
+
+class IdIndex:
+    """
+    int64 id -> int64 值的紧凑索引：键按升序存放，批量查找为一次 searchsorted，不建 Python 字典。
+    值可以是另一个 id（评论 -> 视频），也可以是行号（视频 id -> 视频表中的行）。
+    """
+
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+
+    @classmethod
+    def from_pairs(cls, keys, values):
+        """
+        由成对的键和值构建索引，重复的键只保留第一次出现的值，缺失的键忽略。
+        """
+        keys, valid = _as_ids(keys)
+        values = np.asarray(values, dtype=np.int64)[valid]
+        unique_keys, first = np.unique(keys[valid], return_index=True)
+        return cls(unique_keys, values[first])
+
+    @classmethod
+    def row_index(cls, ids):
+        """
+        id 列 -> 行号的索引，用于按 id 从表中取行。
+        """
+        return cls.from_pairs(ids, np.arange(len(ids)))
+
+    @classmethod
+    def load(cls, path=index_file):
+        with np.load(path) as data:
+            return cls(data['keys'], data['values'])
+
+    def save(self, path=index_file):
+        np.savez(path, keys=self.keys, values=self.values)
+        print(f"索引已保存到: {path}（{len(self)} 个键）")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, ids, missing=MISSING):
+        """
+        批量查找，返回与 ids 等长的 int64 数组，不存在或缺失的 id 为 missing。
+        """
+        ids, valid = _as_ids(ids)
+        if len(self.keys) == 0:
+            return np.full(len(ids), missing, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.keys, ids), len(self.keys) - 1)
+        found = (self.keys[positions] == ids) & valid
+        return np.where(found, self.values[positions], missing)
+
+    def to_frame(self, key_name='comment_id', value_name='video_id'):
+        return pd.DataFrame({key_name: self.keys, value_name: self.values})
+
+
+# --- Step 1: 从爬虫原始评论中读取 comment_id -> video_id ---
+def load_raw_pairs(file_path):
+    """
+    逐条读取原始评论，只保留 comment_id 与 video_id 两列并转为 int64，无法解析的记录丢弃。
+    """
+    pairs = pd.DataFrame.from_records(
+        ((record.get('comment_id'), record.get('video_id')) for record in iter_json_array(file_path)),
+        columns=['comment_id', 'video_id'])
+    pairs = pairs.apply(pd.to_numeric, errors='coerce').dropna()
+    return pairs.astype('int64')
+
+
+def build_mapping(raw_file=raw_comments_file, output_file=mapping_file, output_index=index_file):
+    """
+    用原始评论记录中真实的 video_id 构建映射：保存有序索引（npz）与映射表（Parquet）。
+    同一条评论被重复爬取时只保留第一条。
+    """
+    print("读取原始评论中的 comment_id 与 video_id...")
+    pairs = load_raw_pairs(raw_file)
+    index = IdIndex.from_pairs(pairs['comment_id'], pairs['video_id'])
+    print(f"共 {len(pairs)} 条记录，{len(index)} 条不重复评论，{len(np.unique(index.values))} 个视频")
+
+    index.save(output_index)
+    save_table(index.to_frame(), output_file, 'comment_video_map')
+    return index
+
+
+# --- Step 2: 按 id 关联视频表 ---
+def attach_videos(df, video_df, index=None, id_column='comment_id'):
+    """
+    通过索引为 df 的每条评论找到视频，再按视频 id -> 行号从 video_df 中取出对应行（内连接）。
+    video_df 中重复的 video_id 只取第一行。
+    """
+    index = index if index is not None else IdIndex.load()
+    video_ids = index.lookup(df[id_column])
+    rows = IdIndex.row_index(video_df['video_id']).lookup(video_ids)
+    matched = rows != MISSING
+
+    videos = video_df.drop(columns='video_id').iloc[rows[matched]].reset_index(drop=True)
+    comments = df.loc[matched].reset_index(drop=True)
+    comments['video_id'] = video_ids[matched]
+    # 与评论同名的视频列加后缀 _video
+    videos = videos.rename(columns={c: f"{c}_video" for c in videos.columns if c in comments.columns})
+    return pd.concat([comments, videos], axis=1)
+
+
+def main():
+    start = time.perf_counter()
+    index = build_mapping()
+    print(f"构建耗时 {time.perf_counter() - start:.2f} 秒")
+
+    # 检查清洗后的评论能否全部找到视频
+    comments = load_table(dataset_path('comments'), ['comment_id'], 'comments')
+    video_ids = index.lookup(comments['comment_id'])
+    print(f"清洗后评论中找到视频的: {(video_ids != MISSING).sum()} / {len(comments)}")
+
+
+if __name__ == "__main__":
+    main()
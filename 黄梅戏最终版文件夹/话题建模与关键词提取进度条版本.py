@@ -1,69 +1,70 @@
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.decomposition import NMF
 from sklearn.cluster import KMeans
 from gensim.models import LdaModel
-from gensim.corpora import Dictionary
-from transformers import BertTokenizer, BertModel
 from sklearn.metrics.pairwise import cosine_similarity
-from tqdm import tqdm  # 引入tqdm进度条
-import torch
 import os
 
+from BERT嵌入 import encode_texts, embedding_key
+from 嵌入存储 import EmbeddingStore
+from 流式聚类 import fit_streaming, assign_clusters, save_centroids
+from 稀疏关键词 import keywords_from_matrix
+from 文本特征 import KEYWORD_MAX_FEATURES, load_features, to_gensim, top_feature_columns
+from 分词缓存 import STOP_WORDS
+from 列式存储 import load_table, resolve_path
+from 数据目录 import dataset_path
+
 # --- Step 1: 数据加载 ---
 def load_data(file_path):
     """
     加载评论数据文件。
     """
-    if not os.path.exists(file_path):
+    if not os.path.exists(resolve_path(file_path)):
         raise FileNotFoundError(f"文件不存在: {file_path}")
     print("加载评论数据...")
-    data = pd.read_json(file_path)
+    data = load_table(file_path, columns=['comment_id', 'content'], schema_name='scored_comments')
     # 提取文本列
     comments = data['content'].dropna().tolist()
     return comments, data
 
 # --- Step 2: TF-IDF关键词提取 ---
-def extract_keywords_tfidf(comments, top_n=10):
+def extract_keywords_tfidf(features, top_n=10, max_features=KEYWORD_MAX_FEATURES):
     """
-    使用TF-IDF提取关键词。
+    使用共享特征中的TF-IDF矩阵提取关键词。
     """
     print("\n使用TF-IDF提取关键词...")
-    vectorizer = TfidfVectorizer(max_df=0.85, min_df=2, stop_words='english', max_features=1000)
-    tfidf_matrix = vectorizer.fit_transform(comments)
-    feature_names = vectorizer.get_feature_names_out()
-
-    # 使用tqdm显示进度条
-    keywords = []
-    for row in tqdm(tfidf_matrix, desc="提取关键词进度"):
-        row_data = row.toarray().flatten()
-        top_indices = row_data.argsort()[-top_n:][::-1]
-        top_keywords = [feature_names[i] for i in top_indices]
-        keywords.append(top_keywords)
-    return keywords
+    # 只保留总词频最高的 max_features 个词，再直接在稀疏矩阵上分块取每行 top-n
+    columns = top_feature_columns(features, max_features)
+    feature_names = [features.feature_names[j] for j in columns]
+    return keywords_from_matrix(features.tfidf[:, columns], feature_names, top_n)
 
 # --- Step 3: BERT嵌入与KMeans聚类 ---
-def extract_topics_with_bert(comments, n_clusters=5):
+def extract_topics_with_bert(comments, n_clusters=5, num_threads=None, comment_ids=None, streaming=False):
     """
     使用BERT嵌入生成评论的向量表示，并使用KMeans进行聚类提取主题。
+    传入 comment_ids 时从嵌入存储读取已计算的向量，只对新评论计算嵌入。
+    streaming=True 时按块训练 MiniBatchKMeans 并保存聚类中心，供新增评论直接分配。
     """
     print("\n使用BERT嵌入和KMeans提取话题...")
-    tokenizer = BertTokenizer.from_pretrained('bert-base-chinese')
-    model = BertModel.from_pretrained('bert-base-chinese')
-
-    embeddings = []
-    for comment in tqdm(comments, desc="BERT嵌入处理进度"):
-        inputs = tokenizer(comment, return_tensors='pt', truncation=True, max_length=128, padding='max_length')
-        with torch.no_grad():
-            outputs = model(**inputs)
-        # 获取句向量（CLS token表示）
-        embeddings.append(outputs.last_hidden_state[:, 0, :].numpy().flatten())
+    # 批量获取句向量（CLS token表示），返回 float32 矩阵
+    if comment_ids is None:
+        matrix, rows = encode_texts(comments, num_threads=num_threads, show_progress=True), None
+    else:
+        store = EmbeddingStore.for_model(embedding_key())
+        rows = store.get_or_compute(comment_ids, comments,
+                                    lambda texts: encode_texts(texts, num_threads=num_threads, show_progress=True))
+        matrix = store.matrix()
 
     # KMeans聚类
     print("\n进行KMeans聚类...")
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    clusters = kmeans.fit_predict(embeddings)
+    if streaming:
+        centroids = fit_streaming(matrix, n_clusters, rows=rows)
+        save_centroids(centroids)
+        clusters = assign_clusters(matrix, centroids, rows=rows)
+    else:
+        embeddings = matrix if rows is None else matrix[rows]
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        clusters = kmeans.fit_predict(embeddings)
 
     # 提取每个簇的主题关键词
     clustered_comments = {i: [] for i in range(n_clusters)}
@@ -73,33 +74,28 @@ def extract_topics_with_bert(comments, n_clusters=5):
     return clustered_comments
 
 # --- Step 4: LDA主题建模 ---
-def lda_topic_modeling(comments, num_topics=5):
+def lda_topic_modeling(features, num_topics=5):
     """
-    使用LDA进行主题建模。
+    使用LDA进行主题建模，语料为共享特征中的词频矩阵。
     """
     print("\n使用LDA进行话题建模...")
-    # 文本预处理
-    tokenized_comments = [comment.split() for comment in tqdm(comments, desc="LDA文本分词处理")]
-    dictionary = Dictionary(tokenized_comments)
-    corpus = [dictionary.doc2bow(text) for text in tokenized_comments]
+    corpus, id2word = to_gensim(features)
 
     # LDA建模
-    lda = LdaModel(corpus=corpus, id2word=dictionary, num_topics=num_topics, random_state=42)
+    lda = LdaModel(corpus=corpus, id2word=id2word, num_topics=num_topics, random_state=42)
     topics = lda.print_topics()
     return topics
 
 # --- Step 5: NMF主题建模 ---
-def nmf_topic_modeling(comments, num_topics=5, top_n=10):
+def nmf_topic_modeling(features, num_topics=5, top_n=10):
     """
-    使用NMF进行主题建模。
+    使用NMF进行主题建模，输入为共享特征中的TF-IDF矩阵。
     """
     print("\n使用NMF进行话题建模...")
-    vectorizer = TfidfVectorizer(max_df=0.85, min_df=2, stop_words='english')
-    tfidf_matrix = vectorizer.fit_transform(tqdm(comments, desc="NMF文本向量化"))
-    feature_names = vectorizer.get_feature_names_out()
+    feature_names = features.feature_names
 
     nmf_model = NMF(n_components=num_topics, random_state=42)
-    W = nmf_model.fit_transform(tfidf_matrix)
+    W = nmf_model.fit_transform(features.tfidf)
     H = nmf_model.components_
 
     topics = {}
@@ -124,33 +120,38 @@ def analyze_with_source_keywords(topics, source_keywords):
 # --- Step 7: 主函数 ---
 def main():
     # 文件路径
-    comment_file = r"D:/theguidetoculturaledconomic/数据/情感分析结果打分版本.json"
+    comment_file = dataset_path('scored_comments')
     source_keywords = "黄梅戏 音频分开录制 虚拟背景 数字化创新"
+    stop_words = STOP_WORDS
 
     # 加载评论数据
     comments, data = load_data(comment_file)
 
+    # 分词、词表与TF-IDF只构建一次（已缓存时直接加载），供关键词提取、LDA与NMF共用
+    features = load_features(comment_file, stop_words)
+
     # Step 2: TF-IDF关键词提取
-    tfidf_keywords = extract_keywords_tfidf(comments, top_n=5)
+    tfidf_keywords = extract_keywords_tfidf(features, top_n=5)
     print("\nTF-IDF提取的关键词示例:")
     for i, kw in enumerate(tfidf_keywords[:5]):
         print(f"评论 {i+1}: {kw}")
 
     # Step 3: BERT嵌入与KMeans聚类
-    clustered_comments = extract_topics_with_bert(comments, n_clusters=3)
+    comment_ids = data.loc[data['content'].notna(), 'comment_id'].tolist()
+    clustered_comments = extract_topics_with_bert(comments, n_clusters=3, comment_ids=comment_ids)
     print("\nBERT聚类话题示例:")
     for cluster, texts in clustered_comments.items():
         print(f"\nCluster {cluster}:")
         print("\n".join(texts[:2]))  # 显示每个簇的2条示例
 
     # Step 4: LDA话题建模
-    lda_topics = lda_topic_modeling(comments, num_topics=3)
+    lda_topics = lda_topic_modeling(features, num_topics=3)
     print("\nLDA 话题建模结果:")
     for topic in lda_topics:
         print(topic)
 
     # Step 5: NMF话题建模
-    nmf_topics = nmf_topic_modeling(comments, num_topics=3)
+    nmf_topics = nmf_topic_modeling(features, num_topics=3)
     print("\nNMF 话题建模结果:")
     for topic, keywords in nmf_topics.items():
         print(f"{topic}: {keywords}")
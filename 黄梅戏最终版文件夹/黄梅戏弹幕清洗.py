@@ -1,28 +1,137 @@
+import os
+import shutil
+import time
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from 数据目录 import DANMAKU_COLUMNS, dataset_path
+
+# 读取原始数据，清洗后的数据保存为 CSV（整表模式）或按日期分区的 Parquet 数据集（分块模式）
+file_path = dataset_path('danmaku')
+output_path = dataset_path('cleaned_danmaku')
+output_dir = dataset_path('danmaku_dataset')
+
+# 分块模式：每次读入的 CSV 字节数，内存占用与之成正比，与文件总大小无关
+CHUNKED = True
+BLOCK_SIZE = 64 << 20
+
+# 原始 CSV 各列一律按字符串读入（显示位置、时间中混有无效值），清洗时再按规则转换类型
+COLUMN_TYPES = {name: pa.string() for name in DANMAKU_COLUMNS}
+
+# 清洗后的表结构，分区列为 日期
+CLEANED_SCHEMA = pa.schema([
+    ("弹幕ID", pa.string()),
+    ("弹幕内容", pa.string()),
+    ("时间", pa.timestamp('s')),
+    ("显示位置", pa.float64()),
+    ("用户ID", pa.string()),
+    ("日期", pa.string()),
+])
+
+# 可以转换为浮点数的显示位置
+_NUMBER = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+
+
+# --- 整表模式（原实现，适合小文件） ---
+def clean_in_memory(file_path, output_path):
+    # 加载数据，原始文件没有表头
+    df = pd.read_csv(file_path, header=None, names=DANMAKU_COLUMNS)
+
+    # 数据清洗
+    df["弹幕内容"] = df["弹幕内容"].str.strip().str.replace(r"['\"]", "", regex=True)  # 去除首尾的空格和引号
+
+    # 指定时间格式以避免警告
+    df["时间"] = pd.to_datetime(df["时间"], format="%Y-%m-%d %H:%M:%S", errors='coerce')  # 统一时间格式
+
+    # 处理显示位置，排除无法转换为float的非数值数据
+    df["显示位置"] = pd.to_numeric(df["显示位置"], errors='coerce')  # 将无法转换的值转为NaN
+
+    # 去除显示位置为NaN的行
+    df.dropna(subset=["显示位置"], inplace=True)
+
+    # 去除无效数据（如果时间为空的行）
+    df.dropna(subset=["时间"], inplace=True)
+
+    # 保存清洗后的数据
+    df.to_csv(output_path, index=False, encoding='utf-8')
+
+    print(f"清洗后的数据已保存到: {output_path}")
+
+
+# --- 分块模式 ---
+def clean_batch(batch):
+    """
+    用 pyarrow.compute 清洗一个数据块，规则与整表模式相同：
+    去除内容首尾空白和引号，时间与显示位置无法解析的行丢弃，并增加分区列 日期。
+    """
+    content = pc.replace_substring_regex(pc.utf8_trim_whitespace(batch.column("弹幕内容")),
+                                         pattern=r"['\"]", replacement="")
+    times = pc.strptime(pc.utf8_trim_whitespace(batch.column("时间")),
+                        format="%Y-%m-%d %H:%M:%S", unit='s', error_is_null=True)
+    position = pc.utf8_trim_whitespace(batch.column("显示位置"))
+    position = pc.if_else(pc.match_substring_regex(position, _NUMBER), position, None)
+    position = pc.cast(position, pa.float64())
+
+    table = pa.Table.from_arrays([
+        batch.column("弹幕ID"),
+        content,
+        times,
+        position,
+        batch.column("用户ID"),
+        pc.strftime(times, format="%Y-%m-%d"),
+    ], schema=CLEANED_SCHEMA)
+    valid = pc.and_(pc.is_valid(times), pc.is_valid(position))
+    return table.filter(valid)
 
-# 读取原始数据，并指定第一行为列名
-file_path = r'D:\theguidetoculturaledconomic\数据\黄梅戏弹幕爬取.csv'
-output_path = r'D:\theguidetoculturaledconomic\数据\清洗后的黄梅戏弹幕2.csv'
 
-# 加载数据，指定第一行为列名
-df = pd.read_csv(file_path, header=None, names=["弹幕ID", "弹幕内容", "时间", "显示位置", "用户ID"])
+def clean_chunked(file_path, output_dir, block_size=BLOCK_SIZE):
+    """
+    流式读取原始 CSV（pyarrow 多线程解析，显式列类型），逐块清洗后追加到按 日期 分区的 Parquet 数据集。
+    返回 (读入行数, 保留行数)。
+    """
+    # 重新生成整个数据集，避免与上次运行的文件混在一起
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
 
-# 数据清洗
-df["弹幕内容"] = df["弹幕内容"].str.strip().str.replace(r"['\"]", "", regex=True)  # 去除首尾的空格和引号
+    reader = pv.open_csv(
+        file_path,
+        read_options=pv.ReadOptions(column_names=DANMAKU_COLUMNS, block_size=block_size),
+        convert_options=pv.ConvertOptions(column_types=COLUMN_TYPES),
+    )
+    total_rows = kept_rows = 0
+    for index, batch in enumerate(reader):
+        table = clean_batch(batch)
+        total_rows += batch.num_rows
+        kept_rows += table.num_rows
+        if table.num_rows:
+            pq.write_to_dataset(table, output_dir, partition_cols=["日期"],
+                                basename_template=f"part-{index:05d}-{{i}}.parquet",
+                                existing_data_behavior='overwrite_or_ignore')
+        print(f"已处理 {total_rows} 行，保留 {kept_rows} 行...")
+    return total_rows, kept_rows
 
-# 指定时间格式以避免警告
-df["时间"] = pd.to_datetime(df["时间"], format="%Y-%m-%d %H:%M:%S", errors='coerce')  # 统一时间格式
 
-# 处理显示位置，排除无法转换为float的非数值数据
-df["显示位置"] = pd.to_numeric(df["显示位置"], errors='coerce')  # 将无法转换的值转为NaN
+def load_danmaku(columns=None, dates=None, output_dir=output_dir):
+    """
+    读取分块模式的清洗结果，dates 为需要的日期列表（'YYYY-MM-DD'），只读取对应分区。
+    """
+    filters = [("日期", "in", list(dates))] if dates is not None else None
+    return pq.read_table(output_dir, columns=columns, filters=filters).to_pandas()
 
-# 去除显示位置为NaN的行
-df.dropna(subset=["显示位置"], inplace=True)
 
-# 去除无效数据（如果时间为空的行）
-df.dropna(subset=["时间"], inplace=True)
+def main():
+    start = time.perf_counter()
+    if CHUNKED:
+        total_rows, kept_rows = clean_chunked(file_path, output_dir)
+        print(f"清洗完成: 读入 {total_rows} 行，保留 {kept_rows} 行，耗时 {time.perf_counter() - start:.2f} 秒")
+        print(f"清洗后的数据已保存到: {output_dir}")
+    else:
+        clean_in_memory(file_path, output_path)
 
-# 保存清洗后的数据
-df.to_csv(output_path, index=False, encoding='utf-8')
 
-print(f"清洗后的数据已保存到: {output_path}")
+if __name__ == "__main__":
+    main()